@@ -1,46 +1,91 @@
-import re
-from common.validate_util import check_url, check_mission
-from config.regex import WXWORK_FILL_URL
+import time
+from concurrent.futures import ThreadPoolExecutor
+from common.validate_util import check_url, check_missions, check_missions_incremental, evaluate_missions
+from common.state_util import get_state_path
+from common.watch_util import ReportTailer
+from common.render_util import render_console
+from config.common import INCREMENTAL_CHECK_ENABLED, CHECK_STATE_DIR_PATH, WATCH_POLL_INTERVAL, WATCH_FILE_PATTERN
+from common.parse_util import parse_task_lines
 from common.print_util import colored
+from common.http_util import print_latency_summary
+from common.cookie_util import print_cache_stats, clear_mission_cache, invalidate_missions
+from common.metrics_util import finish_metrics
 
 TEXT = """
 """
 
 
-def parse_text(text):
-    matches = []
-    unrecognized_lines = []
+def check_online_text(text_lines):
+    """
+    校验日报文本中的任务并统计总时长
+    :param text_lines: 可迭代的日报文本行
+    :return: 是否全部通过
+    """
+    task_records, _ = parse_task_lines(text_lines, check_url)
+    # 累计时长
+    total_hours = sum(task_record.self_hours for task_record in task_records)
 
-    for line in text.strip().split('\n'):
-        if line.strip():
-            match = re.match(
-                WXWORK_FILL_URL, line)
+    # 标记是否有任务异常
+    if INCREMENTAL_CHECK_ENABLED:
+        check_results = check_missions_incremental(
+            task_records, {'check_date': False}, get_state_path('check_online_mission', CHECK_STATE_DIR_PATH))
+    else:
+        check_results = check_missions(task_records, {'check_date': False})
+    has_exception = not all(check_results)
 
-            if match:
-                matches.append(match)
-            else:
-                unrecognized_lines.append(line)
-                check_url(line)
+    print(colored(f"\n已计算时长: {total_hours}小时", 'green'))
 
-    return matches, unrecognized_lines
+    if has_exception:
+        print(colored("注意：总时长可能与实际不符！", 'yellow'))
 
+    print_latency_summary()
+    print_cache_stats()
+    finish_metrics()
+    return not has_exception
 
-def main():
-    matches, _ = parse_text(TEXT)
-    total_hours = 0.0  # 初始化累计时长
-    has_exception = False  # 标记是否有任务异常
 
-    for match in matches:
-        hours_str = match.group(2).strip()
-        hours = float(hours_str)
-        total_hours += hours
-        if not check_mission(match, {'check_date': False}):
-            has_exception = True
+def _check_appended_records(task_records):
+    # 在后台线程中执行，异常不会被提交方查看，必须在这里输出，否则该批次的行没有任何结果
+    try:
+        # 监听进程长期运行：每批开始前清空本进程的任务详情缓存，避免无限增长；
+        # 本批任务的持久化缓存标记为过期，用户修改任务后追加的行按最新内容校验
+        clear_mission_cache()
+        invalidate_missions([task_record.wp_id for task_record in task_records])
+        for check_result in evaluate_missions(task_records, {'check_date': False}):
+            render_console(check_result)
+    except Exception as e:
+        serials = ', '.join(task_record.serial for task_record in task_records)
+        print(colored(f"新增行校验失败 | 序号: {serials} | {type(e).__name__}: {e}", 'red'))
 
-    print(colored(f"\n已计算时长: {total_hours}小时", 'green'))
 
-    if has_exception:
-        print(colored("注意：总时长可能与实际不符！", 'yellow'))
+def watch_online_text(watch_path, poll_interval=WATCH_POLL_INTERVAL):
+    """
+    监听日报文本文件或目录，新追加的行在后台校验，并实时输出累计时长
+    :param watch_path: 日报文本文件或目录
+    :param poll_interval: 轮询间隔（秒）
+    """
+    report_tailer = ReportTailer(watch_path, WATCH_FILE_PATTERN)
+    print(colored(f"开始监听：{watch_path}（Ctrl+C 退出）", 'green'))
+
+    # 单线程执行校验，各批次按追加顺序输出，轮询不受接口耗时影响
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        try:
+            while True:
+                new_records, unrecognized_lines = report_tailer.poll()
+                for unrecognized_line in unrecognized_lines:
+                    check_url(unrecognized_line)
+                if new_records:
+                    print(colored(f"新增 {len(new_records)} 条 | 已计算时长: {report_tailer.total_hours:g}小时", 'green'))
+                    executor.submit(_check_appended_records, new_records)
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            print(colored(f"\n已计算时长: {report_tailer.total_hours:g}小时", 'green'))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def main():
+    check_online_text(TEXT.splitlines())
 
 
 if __name__ == "__main__":
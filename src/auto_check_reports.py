@@ -1,52 +1,153 @@
-import re
+import os
+import glob
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-from config.regex import WXWORK_FILL_URL
-from config.common import CHECK_REPORTS_PATH
-from common.validate_util import check_url, check_mission
+from common.parse_util import TaskRecord, TASK_ID_PATTERN
+from common.print_util import colored
+from config.common import CHECK_REPORTS_PATH, INCREMENTAL_CHECK_ENABLED, CHECK_STATE_DIR_PATH, \
+    CHECK_PARSE_WORKERS, EXCEL_READ_ENGINE
+from common.validate_util import check_missions, check_missions_incremental
+from common.state_util import get_state_path
+from common.http_util import print_latency_summary
+from common.cookie_util import print_cache_stats
+from common.metrics_util import finish_metrics
+
+# 校验只需要这几列，其余列不读取
+REPORT_COLUMNS = ('项目名称', '标题', '链接地址', '工作时长')
+# 模板末尾合计行的项目名称
+TOTAL_ROW_LABEL = '合计'
+
+
+def get_excel_engine():
+    """
+    获取读取表格使用的引擎，calamine 解析 xlsx 比 openpyxl 快得多
+    :return: 引擎名称，None 表示使用 pandas 默认的 openpyxl
+    """
+    if EXCEL_READ_ENGINE:
+        return EXCEL_READ_ENGINE
+    return 'calamine' if importlib.util.find_spec('python_calamine') else None
 
 
 def read_excel_file(file_path):
-    df = pd.read_excel(file_path, header=3)
-    df = df.drop(columns=[col for col in df.columns if 'Unnamed' in col])
-    return df
+    return pd.read_excel(file_path, header=3, engine=get_excel_engine(),
+                         usecols=lambda column: column in REPORT_COLUMNS)
+
+
+def build_task_records(df):
+    """
+    直接从表格列构建任务记录，任务ID通过向量化的 str.extract 提取
+    :param df: read_excel_file 读取的 DataFrame
+    :return: (TaskRecord 列表, 无效行的序号列表)
+    """
+    project_names = df['项目名称'].astype(str).str.strip()
+    task_names = df['标题'].astype(str).str.strip()
+    task_urls = df['链接地址'].fillna('').astype(str).str.strip()
+    task_hours = pd.to_numeric(df['工作时长'], errors='coerce')
+    task_ids = (task_urls.str.extract(TASK_ID_PATTERN.pattern, expand=False)
+                .str.lstrip('0').fillna(''))
+
+    # 链接中没有任务ID或工作时长不是数字的行视为无效行；模板中未填写的空行和合计行不算
+    valid_mask = task_ids.ne('') & task_hours.notna()
+    ignored_mask = (task_urls.eq('') & task_hours.isna()) | project_names.eq(TOTAL_ROW_LABEL)
+    invalid_serials = df.index[~valid_mask & ~ignored_mask].astype(str).tolist()
+
+    valid_index = df.index[valid_mask]
+    task_records = list(map(TaskRecord._make, zip(
+        valid_index.astype(str),
+        task_hours[valid_mask].astype(float).tolist(),
+        project_names[valid_mask].tolist(),
+        task_names[valid_mask].tolist(),
+        task_urls[valid_mask].tolist(),
+        task_ids[valid_mask].tolist(),
+        [''] * len(valid_index)
+    )))
+    return task_records, invalid_serials
+
+
+def resolve_report_paths(path_spec):
+    """
+    展开检查路径
+    :param path_spec: 单个文件、通配符或路径列表
+    :return: 去重并排序后的文件路径列表
+    """
+    path_patterns = [path_spec] if isinstance(path_spec, str) else list(path_spec)
+    report_paths = set()
+    for path_pattern in path_patterns:
+        if glob.has_magic(path_pattern):
+            report_paths.update(path for path in glob.glob(path_pattern, recursive=True)
+                                if not os.path.basename(path).startswith('~$'))
+        else:
+            report_paths.add(path_pattern)
+    return sorted(report_paths)
+
+
+def parse_report_file(file_path, serial_prefix=''):
+    """
+    读取并解析单个表格，在子进程中执行，因此只返回可序列化的结果
+    :param file_path: 表格路径
+    :param serial_prefix: 序号前缀，检查多个表格时用于区分来源文件
+    :return: (TaskRecord 列表, 无效行的序号列表)
+    """
+    task_records, invalid_serials = build_task_records(read_excel_file(file_path))
+    if serial_prefix:
+        task_records = [task_record._replace(serial=serial_prefix + task_record.serial)
+                        for task_record in task_records]
+        invalid_serials = [serial_prefix + serial for serial in invalid_serials]
+    return task_records, invalid_serials
+
 
+def parse_report_files(report_paths, max_workers=CHECK_PARSE_WORKERS):
+    """
+    解析多个表格，解析 xlsx 是 CPU 密集型操作，多个文件时分发到进程池
+    :param report_paths: 表格路径列表
+    :param max_workers: 进程数
+    :return: (按文件顺序合并的 TaskRecord 列表, 无效行的序号列表)
+    """
+    serial_prefixes = [f"{os.path.basename(path)}#" if len(report_paths) > 1 else '' for path in report_paths]
+    if len(report_paths) > 1 and max_workers > 1:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(report_paths))) as executor:
+            parsed_reports = list(executor.map(parse_report_file, report_paths, serial_prefixes))
+    else:
+        parsed_reports = list(map(parse_report_file, report_paths, serial_prefixes))
 
-def parse_text(text):
-    matches = []
-    unrecognized_lines = []
+    task_records, invalid_serials = [], []
+    for report_records, report_invalid_serials in parsed_reports:
+        task_records.extend(report_records)
+        invalid_serials.extend(report_invalid_serials)
+    return task_records, invalid_serials
 
-    for line in text.strip().split('\n'):
-        if line.strip():
-            match = re.match(
-                WXWORK_FILL_URL, line)
 
-            if match:
-                matches.append(match)
-            else:
-                unrecognized_lines.append(line)
-                check_url(line)
+def run_checks(task_records, invalid_serials):
+    for serial in invalid_serials:
+        print(colored(f"第 {serial} 行缺少有效的任务链接或工作时长\n", 'yellow'))
 
-    return matches, unrecognized_lines
+    # 所有表格的任务合并后统一校验，重复的任务ID在预取时去重，只获取一次
+    if INCREMENTAL_CHECK_ENABLED:
+        check_missions_incremental(
+            task_records, {'check_date': False}, get_state_path('check_reports', CHECK_STATE_DIR_PATH))
+    else:
+        check_missions(task_records, {'check_date': False})
 
 
-def run_checks(df,):
-    task_text_list = []
-    for index, row in df.iterrows():
-        project_name = row['项目名称']
-        task_name = row['标题']
-        task_url = row['链接地址']
-        task_time = row['工作时长']
-        full_task_text = f'{index}.【{task_time}】{project_name}【{task_name}】{task_url}【{task_time}】'
-        task_text_list.append(full_task_text)
+def check_report_files(path_spec):
+    """
+    检查一个或多个周报表格
+    :param path_spec: 单个文件、通配符或路径列表
+    """
+    report_paths = resolve_report_paths(path_spec)
+    if not report_paths:
+        print(colored(f"没有找到需要检查的表格：{path_spec}", 'yellow'))
+        return
 
-    matches, _ = parse_text('\n'.join(task_text_list))
-    for match in matches:
-        check_mission(match, {'check_date': False})
+    run_checks(*parse_report_files(report_paths))
+    print_latency_summary()
+    print_cache_stats()
+    finish_metrics()
 
 
 def main():
-    df = read_excel_file(CHECK_REPORTS_PATH)
-    run_checks(df)
+    check_report_files(CHECK_REPORTS_PATH)
 
 
 if __name__ == "__main__":
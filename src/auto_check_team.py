@@ -0,0 +1,180 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from common.parse_util import iter_source_lines, iter_task_records
+from common.validate_util import check_url, evaluate_mission, prefetch_missions
+from common.render_util import render_jsonl
+from common.print_util import colored
+from common.http_util import print_latency_summary
+from common.cookie_util import print_cache_stats
+from common.metrics_util import finish_metrics
+from config.common import TEAM_ROSTER_PATH, TEAM_REPORTS_DIR_PATH, TEAM_OUTPUT_DIR_PATH, FETCH_MAX_WORKERS
+
+REPORT_EXTENSIONS = ('.txt', '.xlsx')
+
+
+def read_roster(roster_path):
+    """
+    读取花名册
+    :param roster_path: 每行一个姓名的文本文件
+    :return: 姓名列表
+    """
+    with open(roster_path, encoding='utf-8') as roster_file:
+        return [line.strip() for line in roster_file if line.strip()]
+
+
+def match_report_owner(file_name, roster):
+    """
+    根据文件名识别报告所属的处理人，花名册中有多个姓名匹配时取最长的
+    :param file_name: 报告文件名
+    :param roster: 姓名列表，为空时取文件名中“-”之前的部分
+    :return: 姓名，无法识别时返回 None
+    """
+    file_stem = os.path.splitext(file_name)[0]
+    if not roster:
+        return file_stem.split('-', 1)[0].strip() or None
+
+    matched_names = [name for name in roster if name in file_stem]
+    return max(matched_names, key=len) if matched_names else None
+
+
+def read_report_records(report_path):
+    """
+    读取单个报告文件中的任务记录，无法识别的行（表格中的无效行）逐条提示
+    :param report_path: 日报文本（.txt）或周报表格（.xlsx）
+    :return: (TaskRecord 列表, 无法识别的行数)
+    """
+    file_name = os.path.basename(report_path)
+    if report_path.endswith('.xlsx'):
+        # 只有表格报告才需要 pandas
+        from auto_check_reports import read_excel_file, build_task_records
+        task_records, invalid_serials = build_task_records(read_excel_file(report_path))
+        for serial in invalid_serials:
+            print(colored(f"{file_name}: 第 {serial} 行无效，链接中没有任务ID或工作时长不是数字\n", 'yellow'))
+        return task_records, len(invalid_serials)
+
+    unrecognized_lines = []
+
+    def on_unrecognized(line):
+        unrecognized_lines.append(line)
+        check_url(f"{file_name}: {line}")
+
+    task_records = list(iter_task_records(iter_source_lines(report_path), on_unrecognized))
+    return task_records, len(unrecognized_lines)
+
+
+def collect_team_records(reports_dir_path, roster):
+    """
+    解析目录下所有成员的报告
+    :return: ({姓名: TaskRecord 列表}, {姓名: 无法识别的行数})
+    """
+    team_records = {name: [] for name in roster}
+    unrecognized_counts = dict.fromkeys(roster, 0)
+    for file_name in sorted(os.listdir(reports_dir_path)):
+        if not file_name.endswith(REPORT_EXTENSIONS):
+            continue
+
+        owner_name = match_report_owner(file_name, roster)
+        if owner_name is None:
+            print(colored(f"无法识别报告所属人员，已跳过：{file_name}", 'yellow'))
+            continue
+
+        task_records, unrecognized_count = read_report_records(os.path.join(reports_dir_path, file_name))
+        team_records.setdefault(owner_name, []).extend(task_records)
+        unrecognized_counts[owner_name] = unrecognized_counts.get(owner_name, 0) + unrecognized_count
+    return team_records, unrecognized_counts
+
+
+def check_team(team_records, option, max_workers=FETCH_MAX_WORKERS):
+    """
+    对全体成员的任务去重后统一获取一次，再按各自的处理人并发校验
+    :param team_records: {姓名: TaskRecord 列表}
+    :param option: 校验选项，同 evaluate_mission，处理人按成员自动设置
+    :param max_workers: 并发线程数
+    :return: {姓名: MissionCheckResult 列表}
+    """
+    all_records = [task_record for task_records in team_records.values() for task_record in task_records]
+    prefetch_missions(all_records, max_workers)
+
+    check_jobs = [
+        (name, task_record, {**option, 'handler_name': name})
+        for name, task_records in team_records.items()
+        for task_record in task_records
+    ]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        check_results = list(executor.map(
+            lambda check_job: evaluate_mission(check_job[1], check_job[2]), check_jobs))
+
+    team_results = {name: [] for name in team_records}
+    for (name, _, _), check_result in zip(check_jobs, check_results):
+        team_results[name].append(check_result)
+    return team_results
+
+
+def summarize_team(team_results, unrecognized_counts=None):
+    """
+    汇总每位成员的校验情况
+    :param team_results: {姓名: MissionCheckResult 列表}
+    :param unrecognized_counts: {姓名: 报告中无法识别的行数}
+    :return: 按姓名排列的汇总列表
+    """
+    unrecognized_counts = unrecognized_counts or {}
+    team_summary = []
+    for name, check_results in team_results.items():
+        failed_count = sum(1 for check_result in check_results if not check_result.passed)
+        team_summary.append({
+            'name': name,
+            'tasks': len(check_results),
+            'passed': len(check_results) - failed_count,
+            'failed': failed_count,
+            'unrecognized': unrecognized_counts.get(name, 0),
+            'hours': round(sum(check_result.self_hours for check_result in check_results), 2)
+        })
+    return team_summary
+
+
+def write_team_results(team_results, team_summary, output_dir_path):
+    """
+    每位成员输出一个 JSON Lines 文件，另输出一个汇总 JSON
+    """
+    os.makedirs(output_dir_path, exist_ok=True)
+    for name, check_results in team_results.items():
+        with open(os.path.join(output_dir_path, f'{name}.jsonl'), 'w', encoding='utf-8') as output_file:
+            render_jsonl(check_results, output_file)
+
+    with open(os.path.join(output_dir_path, 'summary.json'), 'w', encoding='utf-8') as output_file:
+        json.dump(team_summary, output_file, ensure_ascii=False, indent=2)
+
+
+def print_team_summary(team_summary):
+    for member in team_summary:
+        status_text = colored('通过', 'green') if not member['failed'] else colored(f"异常 {member['failed']} 条", 'red')
+        if member['unrecognized']:
+            status_text += ' | ' + colored(f"无法识别 {member['unrecognized']} 行", 'yellow')
+        print(f"{member['name']} | 任务: {member['tasks']} 条 | 时长: {member['hours']}小时 | {status_text}")
+
+    total_tasks = sum(member['tasks'] for member in team_summary)
+    total_failed = sum(member['failed'] for member in team_summary)
+    total_unrecognized = sum(member['unrecognized'] for member in team_summary)
+    print(f"\n团队共 {len(team_summary)} 人 | 任务: {total_tasks} 条 | 异常: {total_failed} 条 | "
+          f"无法识别: {total_unrecognized} 行")
+
+
+def main():
+    roster = read_roster(TEAM_ROSTER_PATH) if TEAM_ROSTER_PATH else []
+    team_records, unrecognized_counts = collect_team_records(TEAM_REPORTS_DIR_PATH, roster)
+    team_results = check_team(team_records, {'check_date': False})
+    team_summary = summarize_team(team_results, unrecognized_counts)
+
+    if TEAM_OUTPUT_DIR_PATH:
+        write_team_results(team_results, team_summary, TEAM_OUTPUT_DIR_PATH)
+        print(f"校验结果已输出至：{TEAM_OUTPUT_DIR_PATH}")
+
+    print_team_summary(team_summary)
+    print_latency_summary()
+    print_cache_stats()
+    finish_metrics()
+
+
+if __name__ == "__main__":
+    main()
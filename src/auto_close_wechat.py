@@ -1,48 +1,160 @@
+import os
+import time
+import argparse
 import datetime
 import psutil
-import sys
-import os
+from config.common import CLOSE_WECHAT_SCHEDULES, CLOSE_WECHAT_LOG_DIR_PATH
+
+DEFAULT_LOG_DIR_PATH = os.path.join(os.path.expanduser('~'), '.niuma_helper', 'logs')
+LOG_FILE_NAME = "auto_close_wechat.log"
+# 长时间休眠时分段等待，避免系统休眠/调整时钟后错过计划时间
+MAX_SLEEP_SECONDS = 300
+
+
+class DailyLog:
+    """
+    按日期分目录的日志，持续持有同一个带缓冲的文件句柄，日期变化时才切换文件
+    """
+
+    def __init__(self, log_root_path=''):
+        self._log_root_path = log_root_path or DEFAULT_LOG_DIR_PATH
+        self._log_date = None
+        self._log_file = None
+
+    def _get_log_file(self, now):
+        if self._log_date != now.date():
+            self.close()
+            log_dir_path = os.path.join(self._log_root_path, now.strftime("%Y-%m-%d"))
+            os.makedirs(log_dir_path, exist_ok=True)
+            self._log_file = open(os.path.join(log_dir_path, LOG_FILE_NAME), 'a', encoding='utf-8')
+            self._log_date = now.date()
+        return self._log_file
+
+    def write(self, level, message, now=None):
+        now = now or datetime.datetime.now()
+        print(f"[{level}] {now.strftime('%Y-%m-%d %H:%M:%S')}: {message}", file=self._get_log_file(now))
+
+    def flush(self):
+        if self._log_file is not None:
+            self._log_file.flush()
+
+    def close(self):
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
 
-QUIT_TIME = "17:30"
-TARGET_PROCESS_NAMES = ['WeChatAppEx.exe', 'Weixin.exe']
 
-current_date = datetime.datetime.now().strftime("%Y-%m-%d")
-log_root_path = "E:/项目/Python/日报周报自动化/logs"
-log_dir_path = os.path.join(log_root_path, current_date)
-os.makedirs(log_dir_path, exist_ok=True)
-log_file_path = os.path.join(log_dir_path, "auto_close_wechat.log")
+def parse_schedules(schedules):
+    """
+    解析计划配置
+    :param schedules: [{'time': 'HH:MM', 'process_names': [...]}, ...]
+    :return: [(datetime.time, 进程名列表), ...]，按时间排序
+    """
+    return sorted(
+        (datetime.datetime.strptime(schedule['time'], "%H:%M").time(), list(schedule['process_names']))
+        for schedule in schedules
+    )
 
-try:
-    log_file = open(log_file_path, 'a', encoding='utf-8')
-    sys.stdout = log_file
-except FileNotFoundError:
-    sys.exit(1)
 
+def get_next_deadline(parsed_schedules, now):
+    """
+    获取下一个计划时间，以及该时间需要终止的进程名（多个计划时间相同时合并）
+    :param parsed_schedules: parse_schedules 的结果
+    :param now: 当前时间
+    :return: (datetime, 进程名列表)
+    """
+    deadlines = {}
+    for quit_time, process_names in parsed_schedules:
+        deadline = datetime.datetime.combine(now.date(), quit_time)
+        if deadline <= now:
+            deadline += datetime.timedelta(days=1)
+        deadlines.setdefault(deadline, []).extend(process_names)
 
-def get_quit_datetime():
+    next_deadline = min(deadlines)
+    return next_deadline, deadlines[next_deadline]
+
+
+def sleep_until(deadline):
+    while True:
+        remaining_seconds = (deadline - datetime.datetime.now()).total_seconds()
+        if remaining_seconds <= 0:
+            return
+        time.sleep(min(remaining_seconds, MAX_SLEEP_SECONDS))
+
+
+def find_processes(process_names):
+    """
+    按进程名精确匹配目标进程（不区分大小写）
+    process_iter 会复用已见过的 Process 对象，并按创建时间识别 PID 被复用的进程
+    :param process_names: 目标进程名列表
+    :return: psutil.Process 列表，进程名在 info['name'] 中
+    """
+    target_names = frozenset(name.lower() for name in process_names)
+    return [process for process in psutil.process_iter(['name'])
+            if process.info['name'] and process.info['name'].lower() in target_names]
+
+
+def kill_processes(process_names, log):
+    log.write('info', f"尝试终止进程 {', '.join(process_names)}")
+    for process in find_processes(process_names):
+        process_name = process.info['name']
+        try:
+            process.kill()
+            log.write('info', f"终止进程 {process_name}")
+        except psutil.NoSuchProcess:
+            log.write('error', f"进程 {process_name} 在尝试终止时已不存在")
+        except Exception as e:
+            log.write('error', f"终止进程 {process_name} 时出错: {e}")
+    log.flush()
+
+
+def run_once(parsed_schedules, log):
+    """
+    单次运行：终止今天已过计划时间的所有计划中的进程
+    """
     now = datetime.datetime.now()
-    quit_time = datetime.datetime.strptime(QUIT_TIME, "%H:%M").time()
-    return datetime.datetime.combine(now.date(), quit_time)
+    process_names = [name for quit_time, names in parsed_schedules
+                     if datetime.datetime.combine(now.date(), quit_time) <= now for name in names]
+    if process_names:
+        kill_processes(process_names, log)
+
+
+def run_daemon(parsed_schedules, log):
+    """
+    常驻运行：休眠到下一个计划时间再终止对应的进程
+    """
+    while True:
+        deadline, process_names = get_next_deadline(parsed_schedules, datetime.datetime.now())
+        log.write('info', f"下次执行时间 {deadline.strftime('%Y-%m-%d %H:%M')}")
+        log.flush()
+        sleep_until(deadline)
+        kill_processes(process_names, log)
 
 
-def kill_wechat(now=''):
-    print(f"[info] {now}: 尝试终止进程")
-    for p in psutil.process_iter(['name']):
-        if p.info['name'] and any(target in p.info['name'] for target in TARGET_PROCESS_NAMES):
-            try:
-                p.kill()
-                print(f"[info] {now}: 终止进程 {p.info['name']}")
-            except psutil.NoSuchProcess:
-                print(f"[error] {now}: 进程 {p.info['name']} 在尝试终止时已不存在")
-            except Exception as e:
-                print(f"[error] {now}: 终止进程 {p.info['name']} 时出错: {e}")
+def close_wechat(daemon=False):
+    """
+    按计划终止进程
+    :param daemon: 是否常驻运行
+    """
+    parsed_schedules = parse_schedules(CLOSE_WECHAT_SCHEDULES)
+    log = DailyLog(CLOSE_WECHAT_LOG_DIR_PATH)
+    try:
+        if daemon:
+            run_daemon(parsed_schedules, log)
+        else:
+            run_once(parsed_schedules, log)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        log.close()
 
 
-now = datetime.datetime.now()
-quit_datetime = get_quit_datetime()
-if quit_datetime <= now:
-    kill_wechat(now.strftime("%Y-%m-%d %H:%M:%S"))
+def main():
+    parser = argparse.ArgumentParser(description='到达计划时间后自动关闭微信等进程')
+    parser.add_argument('--daemon', action='store_true', help='常驻运行，按计划时间依次执行')
+    args = parser.parse_args()
+    close_wechat(args.daemon)
 
 
-sys.stdout = sys.__stdout__
-log_file.close()
+if __name__ == "__main__":
+    main()
@@ -1,222 +1,254 @@
-import re
 import datetime
 import os
-import xlwings as xw
-from common.cookie_util import get_mission_info
-from common.time_util import get_month_week
-from common.validate_util import check_url, check_mission
-from config.common import HANDLER_NAME, TEMPLATE_PATH, TARGET_TEMPLATE_DIR_PATH
-from config.regex import WXWORK_FILL_URL
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from common.cookie_util import get_mission_info, print_cache_stats
+from common.http_util import print_latency_summary
+from common.time_util import get_month_week, parse_iso_date
+from common.workbook_util import open_workbook
+from common.metrics_util import timed_stage, finish_metrics
+from common.validate_util import check_url, evaluate_mission, prefetch_missions
+from common.render_util import render_console
+from common.history_util import ReportHistoryIndex
+from common.print_util import colored
+from common.parse_util import parse_task_lines
+from config.common import HANDLER_NAME, TEMPLATE_PATH, TARGET_TEMPLATE_DIR_PATH, FETCH_MAX_WORKERS, FILL_QUEUE_SIZE, \
+    HISTORY_INDEX_ENABLED, BATCH_PAGE_SIZE
 
 TEXT = """
 """
 
 FILL_START_ROW = 5
+# 流水线中累计到该行数再写入一次，减少Excel跨进程调用次数
+FILL_WRITE_BATCH_SIZE = 20
 
 
-def parse_task_text(text_content, match_pattern):
+@timed_stage('parse_task_text')
+def parse_task_text(text_lines):
     """
     解析任务文本内容，识别匹配和未匹配的行数据
-    :param text_content: 待解析的原始文本
-    :param match_pattern: 用于匹配任务的正则表达式
-    :return: 匹配成功的任务正则结果列表、未识别的文本行列表
+    :param text_lines: 可迭代的原始文本行
+    :return: 匹配成功的任务记录列表、未识别的文本行列表
     """
-    matched_task_list = []
-    unrecognized_line_list = []
+    return parse_task_lines(text_lines, check_url)
 
-    # 遍历每行文本做匹配处理
-    for single_line in text_content.strip().split('\n'):
-        trim_line = single_line.strip()
-        if trim_line:
-            line_match = re.match(match_pattern, trim_line)
-            if line_match:
-                matched_task_list.append(line_match)
-            else:
-                unrecognized_line_list.append(trim_line)
-                check_url(trim_line)
 
-    return matched_task_list, unrecognized_line_list
-
-
-def fill_task_data_to_excel(matched_task_list, excel_file_path):
+def build_task_row(task_record):
     """
-    xlwings操作Excel，将校验通过的任务数据填充至表格中
-    :param matched_task_list: 正则匹配成功的任务结果列表
-    :param excel_file_path: Excel文件的完整路径
-    :return: 成功填充的数据条数
+    根据任务记录和任务详情，构建 B:N 列的一行数据
+    :param task_record: TaskRecord 任务记录
+    :return: 13 个单元格值组成的列表，任务ID解析失败或任务详情获取失败时返回 None
     """
-    current_fill_row = FILL_START_ROW
-    excel_app = None
-    excel_workbook = None
-    excel_worksheet = None
-    success_fill_count = 0
-
+    task_id = task_record.wp_id
+    if not task_id:
+        return None
+
+    # 获取任务详情，描述中的预估工时已在获取时解析
+    mission_info = get_mission_info(task_id)
+    # 任务不存在或无权访问时跳过该行，校验结果中已提示获取失败
+    if mission_info is None:
+        return None
+
+    # 任务ID和日期按数字、日期写入，两种工作簿后端得到相同的单元格类型，模板中的日期格式才能生效
+    start_date = parse_iso_date(mission_info.start_date)
+    due_date = parse_iso_date(mission_info.due_date)
+    return [
+        task_record.project,  # B 项目名称
+        int(task_id) if task_id.isdigit() else task_id,  # C 任务ID
+        task_record.title,  # D 任务标题
+        task_record.url,  # E 任务链接
+        "已完成",  # F 任务状态
+        "中",  # G 优先级
+        start_date,  # H 开始日期
+        due_date,  # I 截止日期
+        HANDLER_NAME,  # J 处理人
+        mission_info.estimated_work_hours,  # K 预估工时
+        mission_info.completed_hours,  # L 完成工时
+        due_date,  # M 完成时间
+        task_record.self_hours  # N 自评时长
+    ]
+
+
+def _produce_task_page(start_index, page_records, row_queue, cancel_event):
+    """
+    生产者：批量获取一页任务的详情，再逐条校验并构建行数据，放入有界队列
+    各页并发获取，写入线程在后续页仍在请求接口时即可写入已就绪的行
+    """
+    if cancel_event.is_set():
+        return
     try:
-        excel_app = xw.App(visible=False, add_book=False)
-        excel_workbook = excel_app.books.open(excel_file_path, read_only=False)
-        excel_worksheet = excel_workbook.sheets[0]
-
-        # 遍历匹配的任务，校验通过则填充数据
-        for task_match in matched_task_list:
-            check_mission(task_match, {'check_date': False})
-
-            # 提取正则匹配的任务基础数据
-            task_serial_num = task_match.group(1).strip()
-            task_self_est_hours_str = task_match.group(2).strip()
-            task_project_name = task_match.group(3).strip()
-            task_title = task_match.group(4).strip()
-            task_url = task_match.group(5).strip()
-
-            task_id_match = re.search(r'/wp/(\d+)', task_url)
-            task_id = ""
-            if task_id_match:
-                try:
-                    task_id = str(int(task_id_match.group(1).strip()))
-                except (ValueError, TypeError):
-                    task_id = ""
-
-            if not task_id:
-                continue
+        prefetch_missions(page_records, max_workers=1)
+    except Exception as e:
+        # 预取失败时由下面逐条获取并处理
+        print(f"批量获取任务详情失败，将逐个获取：{e}")
 
-            # 获取任务详情完整数据
-            task_detail_data = get_mission_info(task_id)
-            task_desc_html = task_detail_data['description']['html']
-
-            # 解析任务预估工时
-            est_work_hours_match = re.search(
-                r'<p class="op-uc-p">预估工时/时长[：:]\s*(\d+\.?\d*).*?</p>',
-                task_desc_html,
-                re.S
-            )
-            est_work_hours_str = est_work_hours_match.group(
-                1).strip() if est_work_hours_match else ''
-
-            # 项目名称
-            excel_worksheet.range(
-                f'B{current_fill_row}').value = task_project_name
-            # 任务ID
-            excel_worksheet.range(
-                f'C{current_fill_row}').value = task_id
-            # 任务标题
-            excel_worksheet.range(
-                f'D{current_fill_row}').value = task_title
-            # 任务链接
-            excel_worksheet.range(
-                f'E{current_fill_row}').value = task_url
-            # 任务状态
-            excel_worksheet.range(
-                f'F{current_fill_row}').value = "已完成"
-            # 优先级
-            excel_worksheet.range(
-                f'G{current_fill_row}').value = "中"
-            # 开始日期
-            excel_worksheet.range(
-                f'H{current_fill_row}').value = task_detail_data['startDate']
-            # 截止日期
-            excel_worksheet.range(
-                f'I{current_fill_row}').value = task_detail_data['dueDate']
-            # 处理人
-            excel_worksheet.range(
-                f'J{current_fill_row}').value = HANDLER_NAME
-            # 完成时间
-            excel_worksheet.range(
-                f'M{current_fill_row}').value = task_detail_data['dueDate']
-
-            # 预估工时
-            try:
-                excel_worksheet.range(f'K{current_fill_row}').value = float(
-                    est_work_hours_str)
-            except (ValueError, TypeError):
-                excel_worksheet.range(f'K{current_fill_row}').value = 0.0
+    for index, task_record in enumerate(page_records, start_index):
+        try:
+            item = (evaluate_mission(task_record, {'check_date': False}), build_task_row(task_record))
+        except Exception as e:
+            item = e
 
-            # 完成工时
+        # 队列已满时等待写入线程消费，写入失败取消后不再放入
+        while not cancel_event.is_set():
             try:
-                excel_worksheet.range(f'L{current_fill_row}').value = float(
-                    task_detail_data['customField1'])
-            except (ValueError, TypeError):
-                excel_worksheet.range(f'L{current_fill_row}').value = 0.0
+                row_queue.put((index, item), timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        else:
+            return
 
-            # 自评时长
-            try:
-                excel_worksheet.range(f'N{current_fill_row}').value = float(
-                    task_self_est_hours_str)
-            except (ValueError, TypeError):
-                excel_worksheet.range(f'N{current_fill_row}').value = 0.0
-
-            print(
-                f"序号: {task_serial_num} | 项目: {task_project_name} | 任务: {task_title}")
-            current_fill_row += 1
-            success_fill_count += 1
-
-        excel_workbook.save()
-        return success_fill_count
-    except Exception as e:
-        print(f"\n❌ Excel数据填充失败：{str(e)}")
+
+@timed_stage('fill_rows_pipeline')
+def fill_rows_pipeline(task_record_list, source_file_path, target_file_path=None):
+    """
+    生产者/消费者流水线：多个线程按页（BATCH_PAGE_SIZE）并发获取和校验任务，当前线程作为唯一的写入线程持有工作簿，
+    按原始顺序攒够 FILL_WRITE_BATCH_SIZE 行后写入一次，网络请求与打开、写入工作簿同时进行
+    :param task_record_list: 任务记录列表
+    :param source_file_path: 要打开的Excel文件路径
+    :param target_file_path: 另存为的路径，为 None 时保存到原文件
+    :return: 成功填充的数据条数
+    """
+    task_count = len(task_record_list)
+    row_queue = queue.Queue(maxsize=FILL_QUEUE_SIZE)
+    cancel_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max(1, FETCH_MAX_WORKERS))
+
+    try:
+        for start_index in range(0, task_count, BATCH_PAGE_SIZE):
+            executor.submit(_produce_task_page, start_index,
+                            task_record_list[start_index:start_index + BATCH_PAGE_SIZE], row_queue, cancel_event)
+
+        # 生产者开始请求接口的同时打开工作簿
+        with open_workbook(source_file_path) as excel_workbook:
+            pending_items = {}
+            ready_rows = []
+            next_index = 0
+            current_fill_row = FILL_START_ROW
+
+            while next_index < task_count:
+                index, item = row_queue.get()
+                pending_items[index] = item
+
+                # 取出按原始顺序连续就绪的行
+                while next_index in pending_items:
+                    item = pending_items.pop(next_index)
+                    task_record = task_record_list[next_index]
+                    next_index += 1
+                    if isinstance(item, Exception):
+                        raise item
+
+                    check_result, task_row = item
+                    render_console(check_result)
+                    if task_row is None:
+                        continue
+
+                    print(
+                        f"序号: {task_record.serial} | 项目: {task_record.project} | 任务: {task_record.title}")
+                    ready_rows.append(task_row)
+
+                if len(ready_rows) >= FILL_WRITE_BATCH_SIZE or next_index == task_count:
+                    excel_workbook.write_rows(current_fill_row, ready_rows)
+                    current_fill_row += len(ready_rows)
+                    ready_rows = []
+
+            excel_workbook.save(target_file_path)
+
+        return current_fill_row - FILL_START_ROW
+    except BaseException:
+        cancel_event.set()
         raise
     finally:
-        if excel_workbook is not None:
-            excel_workbook.close()
-        if excel_app is not None:
-            excel_app.quit()
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
-def create_excel_from_template(template_file_path):
+def get_target_report_path():
+    """
+    构建本周周报的存储路径：TARGET_TEMPLATE_DIR_PATH/<年>年/<月>月/<处理人>-<月>月第<周>周周报.xlsx
+    目录不存在时自动创建
+    :return: 新周报文件的完整路径
+    """
+    # 获取当前时间维度信息
+    current_datetime = datetime.datetime.now()
+    current_year = current_datetime.year
+    current_month = current_datetime.month
+    current_month_week = get_month_week()
+
+    target_save_dir = os.path.join(
+        TARGET_TEMPLATE_DIR_PATH,
+        f"{current_year}年",
+        f"{current_month}月"
+    )
+    os.makedirs(target_save_dir, exist_ok=True)
+
+    # 构建新文件名称和完整路径
+    new_excel_filename = f"{HANDLER_NAME}-{current_month}月第{current_month_week}周周报.xlsx"
+    return os.path.join(target_save_dir, new_excel_filename)
+
+
+@timed_stage('create_and_fill_report')
+def create_and_fill_report(template_file_path, matched_task_list):
     """
-    基于指定的Excel模板，创建带时间命名的新周报文件
+    只打开一次模板：填充任务数据后直接另存为本周周报，省去二次启动和重复读写
     :param template_file_path: Excel模板文件的完整路径
-    :return: 新建Excel文件的完整路径
+    :param matched_task_list: 任务记录列表
+    :return: (新周报文件的完整路径, 成功填充的数据条数)
     """
-    excel_app = None
-    template_workbook = None
     try:
         # 校验模板文件是否存在
         if not os.path.exists(template_file_path):
             raise FileNotFoundError(f"模板文件不存在，请检查路径：{template_file_path}")
 
-        # 获取当前时间维度信息
-        current_datetime = datetime.datetime.now()
-        current_year = current_datetime.year
-        current_month = current_datetime.month
-        current_month_week = get_month_week()
-
-        target_save_dir = os.path.join(
-            TARGET_TEMPLATE_DIR_PATH,
-            f"{current_year}年",
-            f"{current_month}月"
-        )
-        os.makedirs(target_save_dir, exist_ok=True)
-
-        # 构建新文件名称和完整路径
-        new_excel_filename = f"{HANDLER_NAME}-{current_month}月第{current_month_week}周周报.xlsx"
-        new_excel_filepath = os.path.join(target_save_dir, new_excel_filename)
-
-        # 打开模板并另存为新文件
-        excel_app = xw.App(visible=False, add_book=False)
-        template_workbook = excel_app.books.open(template_file_path)
-        template_workbook.save(new_excel_filepath)
-
-        return new_excel_filepath
+        new_excel_filepath = get_target_report_path()
+        filled_count = fill_rows_pipeline(
+            matched_task_list, template_file_path, new_excel_filepath)
+
+        return new_excel_filepath, filled_count
     except Exception as e:
-        print(f"\n❌ Excel文件创建失败：{str(e)}")
+        print(f"\n❌ Excel周报生成失败：{str(e)}")
         raise
-    finally:
-        # 释放Excel模板资源
-        if template_workbook is not None:
-            template_workbook.close()
-        if excel_app is not None:
-            excel_app.quit()
 
 
-def main():
+def warn_reported_tasks(task_record_list, current_report_path):
+    """
+    更新历史周报索引，提示已在往期周报中填报过的任务
+    :param task_record_list: 任务记录列表
+    :param current_report_path: 本周周报路径，不参与比对
+    """
     try:
-        new_excel_path = create_excel_from_template(TEMPLATE_PATH)
+        history_index = ReportHistoryIndex()
+        try:
+            history_index.update(TARGET_TEMPLATE_DIR_PATH)
+            reported_tasks = history_index.find_reported(
+                [task_record.wp_id for task_record in task_record_list], current_report_path)
+        finally:
+            history_index.close()
+    except Exception as e:
+        print(f"历史周报索引不可用，跳过重复填报检查：{e}")
+        return
 
-        matched_tasks, unrecognized_lines = parse_task_text(
-            TEXT, WXWORK_FILL_URL)
+    for task_record in task_record_list:
+        for report_path, _, _, _ in reported_tasks.get(task_record.wp_id, []):
+            print(colored(
+                f"任务已在往期周报中填报 | 序号: {task_record.serial} | 任务ID: {task_record.wp_id} | "
+                f"周报: {os.path.basename(report_path)}", 'yellow'))
+
+
+def fill_report(text_lines):
+    """
+    解析日报文本，生成本周周报并填充任务
+    :param text_lines: 可迭代的日报文本行
+    :return: 生成的周报路径
+    """
+    try:
+        matched_tasks, unrecognized_lines = parse_task_text(text_lines)
         total_recognized_count = len(matched_tasks)
+        if HISTORY_INDEX_ENABLED:
+            warn_reported_tasks(matched_tasks, get_target_report_path())
 
-        total_filled_count = fill_task_data_to_excel(
-            matched_tasks, new_excel_path)
+        new_excel_path, total_filled_count = create_and_fill_report(
+            TEMPLATE_PATH, matched_tasks)
 
         print(f"文本中识别到的任务数据条数 ：{total_recognized_count} 条")
         print(f"成功填充到Excel的任务条数 ：{total_filled_count} 条")
@@ -228,10 +260,18 @@ def main():
                 print(f"   {idx}. {unrecognized_line}")
 
         print(f"文件存储路径：{new_excel_path}")
+        print_latency_summary()
+        print_cache_stats()
+        finish_metrics()
+        return new_excel_path
     except Exception as e:
         print(f"❌ 程序执行异常终止：{str(e)}")
         raise
 
 
+def main():
+    fill_report(TEXT.splitlines())
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,160 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import platform
+import tempfile
+from contextlib import redirect_stdout
+
+import config.common as common_config
+
+BENCH_SIZES = [10, 1000, 10000]
+BENCH_LATENCY = 0.02  # 模拟接口每次请求的延迟（秒）
+BENCH_OUTPUT_PATH = 'bench_results.json'
+TEMPLATE_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'assets', 'templates', '模板.xlsx')
+
+
+def generate_report_text(task_count, base_url='http://127.0.0.1/wp'):
+    """
+    生成 N 行符合 WXWORK_FILL_URL 格式的日报文本，内容与模拟接口返回的任务详情一致
+    :param task_count: 任务数量
+    :param base_url: 任务链接前缀
+    :return: 日报文本
+    """
+    lines = []
+    for serial in range(1, task_count + 1):
+        mission_id = 10000 + serial
+        hours = mission_id % 8 + 1
+        lines.append(
+            f'{serial}.【{hours}】模拟项目{mission_id % 10}【模拟任务{mission_id}】{base_url}/{mission_id}【{hours}】')
+    return '\n'.join(lines)
+
+
+def generate_check_sheet(task_count, file_path, base_url='http://127.0.0.1/wp'):
+    """
+    基于周报模板生成检查用表格，表头在第4行，与 read_excel_file 的 header=3 一致
+    :param task_count: 任务数量
+    :param file_path: 生成的表格路径
+    :param base_url: 任务链接前缀
+    """
+    from common.workbook_util import open_workbook
+    from auto_fill_reports import FILL_START_ROW
+
+    today = datetime.date.today().isoformat()
+    rows = []
+    for serial in range(1, task_count + 1):
+        mission_id = 10000 + serial
+        hours = mission_id % 8 + 1
+        rows.append([
+            f'模拟项目{mission_id % 10}', mission_id, f'模拟任务{mission_id}', f'{base_url}/{mission_id}',
+            '已完成', '中', today, today, common_config.HANDLER_NAME, hours, hours, today, hours
+        ])
+
+    with open_workbook(TEMPLATE_FILE_PATH, backend='openpyxl') as workbook:
+        workbook.write_rows(FILL_START_ROW, rows)
+        workbook.save(file_path)
+
+
+def _time_stage(stage_func, task_count):
+    # 丢弃阶段内的控制台输出，避免终端I/O影响计时
+    start_time = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        stage_result = stage_func()
+    elapsed = time.perf_counter() - start_time
+    return stage_result, {
+        'seconds': round(elapsed, 4),
+        'tasks_per_second': round(task_count / elapsed, 1) if elapsed > 0 else None
+    }
+
+
+def run_benchmark(task_count, work_dir_path, max_workers):
+    """
+    对指定任务数量依次执行各阶段并计时
+    :return: 各阶段耗时结果
+    """
+    from common.parse_util import parse_tasks
+    from common.cookie_util import clear_mission_cache, get_cache_stats
+    from common.validate_util import evaluate_missions
+    from auto_check_reports import read_excel_file, build_task_records
+    from auto_fill_reports import create_and_fill_report
+
+    report_text = generate_report_text(task_count)
+    sheet_path = os.path.join(work_dir_path, f'check_{task_count}.xlsx')
+    generate_check_sheet(task_count, sheet_path)
+
+    stages = {}
+    clear_mission_cache()
+
+    task_records, stages['parse'] = _time_stage(
+        lambda: parse_tasks(report_text)[0], task_count)
+    check_df, stages['read_sheet'] = _time_stage(
+        lambda: read_excel_file(sheet_path), task_count)
+    _, stages['build_sheet_records'] = _time_stage(
+        lambda: build_task_records(check_df), task_count)
+    check_results, stages['check_mission'] = _time_stage(
+        lambda: evaluate_missions(task_records, {'check_date': False}, max_workers), task_count)
+    _, stages['fill'] = _time_stage(
+        lambda: create_and_fill_report(TEMPLATE_FILE_PATH, task_records), task_count)
+    # 冷缓存填充：获取与写入在流水线中重叠，耗时应接近 max(check_mission, fill) 而非二者之和
+    clear_mission_cache()
+    _, stages['fill_cold'] = _time_stage(
+        lambda: create_and_fill_report(TEMPLATE_FILE_PATH, task_records), task_count)
+
+    return {
+        'tasks': task_count,
+        'passed': sum(1 for result in check_results if result.passed),
+        'cache': get_cache_stats(),
+        'stages': stages
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='周报解析、校验、填充的端到端基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=BENCH_SIZES, help='任务数量')
+    parser.add_argument('--latency', type=float, default=BENCH_LATENCY, help='模拟接口延迟（秒）')
+    parser.add_argument('--workers', type=int, default=common_config.FETCH_MAX_WORKERS, help='并发线程数')
+    parser.add_argument('--output', default=BENCH_OUTPUT_PATH, help='结果JSON文件路径')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir_path:
+        # 必须在导入业务模块之前修改配置：各模块导入时即读取配置值
+        common_config.CACHE_ENABLED = False
+        common_config.SNAPSHOT_MODE = ''
+        common_config.WORKBOOK_BACKEND = 'openpyxl'
+        common_config.TARGET_TEMPLATE_DIR_PATH = work_dir_path
+
+        from mock_api_server import start_mock_server
+        mock_server = start_mock_server(latency=args.latency)
+        common_config.API_BASE_URL = mock_server.base_url
+
+        try:
+            results = []
+            for task_count in args.sizes:
+                result = run_benchmark(task_count, work_dir_path, args.workers)
+                results.append(result)
+                stage_text = ' | '.join(
+                    f"{stage_name}: {stage['seconds']}s" for stage_name, stage in result['stages'].items())
+                print(f"任务数 {task_count:>6} | {stage_text}")
+        finally:
+            mock_server.shutdown()
+            mock_server.server_close()
+
+    report = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'latency': args.latency,
+        'workers': args.workers,
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, ensure_ascii=False, indent=2)
+    print(f"基准测试结果已写入：{args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from common.snapshot_util import is_snapshot_mode
+from config.common import CACHE_ENABLED, CACHE_DB_PATH, CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES
+
+DEFAULT_CACHE_DB_PATH = os.path.join(
+    os.path.expanduser('~'), '.niuma_helper', 'mission_cache.db')
+
+
+class CacheEntry:
+    __slots__ = ('mission_id', 'payload', 'etag', 'lock_version', 'updated_at', 'is_fresh')
+
+    def __init__(self, mission_id, payload, etag, lock_version, updated_at, is_fresh):
+        self.mission_id = mission_id
+        self.payload = payload
+        self.etag = etag
+        self.lock_version = lock_version
+        self.updated_at = updated_at
+        self.is_fresh = is_fresh
+
+
+class MissionDiskCache:
+    """
+    基于 SQLite 的任务详情持久化缓存
+    - TTL 内的条目直接使用，不请求接口
+    - 超过 TTL 的条目需通过 ETag 或 lockVersion/updatedAt 重新验证后才能使用
+    - 条目数超过上限时，按最近访问时间淘汰（LRU）
+    """
+
+    def __init__(self, db_path, ttl_seconds=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        db_dir_path = os.path.dirname(db_path)
+        if db_dir_path:
+            os.makedirs(db_dir_path, exist_ok=True)
+
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('''
+            CREATE TABLE IF NOT EXISTS missions (
+                id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                etag TEXT,
+                lock_version INTEGER,
+                updated_at TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS idx_missions_accessed_at ON missions (accessed_at)')
+        self._connection.commit()
+
+    def get_many(self, mission_ids):
+        """
+        批量读取缓存条目并刷新访问时间
+        :param mission_ids: 任务ID列表
+        :return: {任务ID: CacheEntry}，不存在的任务ID不在结果中
+        """
+        mission_ids = [str(mission_id) for mission_id in mission_ids]
+        if not mission_ids:
+            return {}
+
+        now = time.time()
+        rows = []
+        with self._lock:
+            # 分批查询，避免超出 SQLite 的参数数量上限
+            for batch_start in range(0, len(mission_ids), 500):
+                batch_ids = mission_ids[batch_start:batch_start + 500]
+                placeholders = ','.join('?' * len(batch_ids))
+                rows.extend(self._connection.execute(
+                    f'SELECT id, payload, etag, lock_version, updated_at, fetched_at '
+                    f'FROM missions WHERE id IN ({placeholders})',
+                    batch_ids
+                ).fetchall())
+            self._connection.executemany(
+                'UPDATE missions SET accessed_at = ? WHERE id = ?',
+                [(now, row[0]) for row in rows]
+            )
+            self._connection.commit()
+
+        return {
+            mission_id: CacheEntry(
+                mission_id, json.loads(payload), etag, lock_version, updated_at,
+                now - fetched_at < self.ttl_seconds
+            )
+            for mission_id, payload, etag, lock_version, updated_at, fetched_at in rows
+        }
+
+    def get(self, mission_id):
+        """
+        读取缓存条目并刷新访问时间
+        :param mission_id: 任务ID
+        :return: CacheEntry，不存在时返回 None
+        """
+        return self.get_many([mission_id]).get(str(mission_id))
+
+    def put_many(self, missions):
+        """
+        写入任务详情，写入后执行一次 LRU 淘汰
+        :param missions: [(MissionInfo 对象, ETag), ...]
+        """
+        now = time.time()
+        rows = [
+            (
+                mission_info.task_id,
+                json.dumps(mission_info.to_dict(), ensure_ascii=False),
+                etag,
+                mission_info.lock_version,
+                mission_info.updated_at,
+                now,
+                now
+            )
+            for mission_info, etag in missions
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO missions VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            self._connection.execute('''
+                DELETE FROM missions WHERE id NOT IN (
+                    SELECT id FROM missions ORDER BY accessed_at DESC LIMIT ?
+                )
+            ''', (self.max_entries,))
+            self._connection.commit()
+
+    def put(self, mission_info, etag=None):
+        self.put_many([(mission_info, etag)])
+
+    def touch(self, mission_ids):
+        """
+        重新验证通过后刷新条目的获取时间，使其在新的 TTL 内有效
+        :param mission_ids: 任务ID列表
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                'UPDATE missions SET fetched_at = ?, accessed_at = ? WHERE id = ?',
+                [(now, now, str(mission_id)) for mission_id in mission_ids]
+            )
+            self._connection.commit()
+
+    def expire(self, mission_ids):
+        """
+        将条目标记为已过期，下次使用前需重新验证（任务详情已确认有变化时调用）
+        :param mission_ids: 任务ID列表
+        """
+        with self._lock:
+            self._connection.executemany(
+                'UPDATE missions SET fetched_at = 0 WHERE id = ?',
+                [(str(mission_id),) for mission_id in mission_ids]
+            )
+            self._connection.commit()
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute('DELETE FROM missions')
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+
+def get_disk_cache():
+    """
+    获取进程内共享的持久化缓存（懒加载）
+    :return: MissionDiskCache，未启用或处于快照模式时返回 None
+    """
+    global _disk_cache
+    if not CACHE_ENABLED or is_snapshot_mode():
+        return None
+    if _disk_cache is None:
+        with _disk_cache_lock:
+            if _disk_cache is None:
+                _disk_cache = MissionDiskCache(CACHE_DB_PATH or DEFAULT_CACHE_DB_PATH)
+    return _disk_cache
@@ -1,12 +1,358 @@
-import requests
-from config.common import COOKIE, API_BASE_URL
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from common.http_util import http_get
+from common.metrics_util import timed_stage
+from common.throttle_util import InFlightCoalescer
+from common.cache_util import get_disk_cache
+from common.snapshot_util import is_snapshot_mode, is_replay_mode, record_missions, replay_mission_info, \
+    get_replay_missions
+from common.mission_util import MISSION_SELECT_FIELDS, project_mission_info, load_cached_mission_info
+from config.common import API_BASE_URL, BATCH_FETCH_ENABLED, BATCH_PAGE_SIZE, FETCH_MAX_WORKERS, \
+    API_SELECT_FIELDS_ENABLED
 
+# 本次运行内的任务详情缓存，按任务ID索引，校验和填充共用，只保存投影后的 MissionInfo
+_mission_cache = {}
+_mission_cache_lock = threading.Lock()
+_cache_stats = {'hit': 0, 'miss': 0, 'batch': 0, 'disk_hit': 0, 'revalidated': 0}
+# 同一任务ID的并发请求只发出一次
+_mission_coalescer = InFlightCoalescer()
+
+
+def _raise_for_server_error(response):
+    # 限流或服务端错误时响应体通常不是任务详情，直接抛出明确的异常
+    if response.status_code == 429 or response.status_code >= 500:
+        response.raise_for_status()
+
+
+def _is_valid_mission_info(mission_info):
+    # 只缓存正常的任务详情，接口报错时下次仍会重新请求
+    return isinstance(mission_info, dict) and 'id' in mission_info and mission_info.get('_type') != 'Error'
+
+
+@timed_stage('http.fetch_mission_info')
+def _fetch_mission_info(mission_id, etag=None):
+    """
+    请求单个任务详情，传入 ETag 时发起条件请求
+    :param mission_id: 任务ID
+    :param etag: 缓存中的 ETag
+    :return: (任务详情字典, ETag)，未修改（304）时任务详情为 None
+    """
+    if is_replay_mode():
+        return replay_mission_info(mission_id), None
 
-def get_mission_info(mission_id):
     url = f'{API_BASE_URL}/{mission_id}'
-    headers = {
-        'Cookie': COOKIE
+    headers = {'If-None-Match': etag} if etag else None
+    response = http_get(url, headers=headers)
+    if response.status_code == 304:
+        return None, etag
+    _raise_for_server_error(response)
+    mission_info = response.json()
+    record_missions([mission_info])
+    return mission_info, response.headers.get('ETag')
+
+
+@timed_stage('http.fetch_collection')
+def _fetch_collection(mission_ids, select=None):
+    if is_replay_mode():
+        replay_missions = get_replay_missions()
+        return [replay_missions[str(mission_id)] for mission_id in mission_ids
+                if str(mission_id) in replay_missions]
+
+    filters = [{'id': {'operator': '=', 'values': mission_ids}}]
+    params = {
+        'filters': json.dumps(filters),
+        'pageSize': len(mission_ids),
+        'offset': 1
+    }
+    if select:
+        params['select'] = select
+    response = http_get(API_BASE_URL, params=params)
+    _raise_for_server_error(response)
+    collection = response.json()
+    elements = collection.get('_embedded', {}).get('elements', [])
+    if not select:
+        record_missions(elements)
+    return elements
+
+
+def _fetch_mission_info_page(mission_ids):
+    """
+    通过集合接口的ID过滤，一次请求获取多个任务详情
+    开启字段选择时只请求校验和填充用到的字段；录制快照时仍请求完整详情，保证快照与接口返回一致
+    :param mission_ids: 任务ID列表
+    :return: 任务详情字典列表
+    """
+    use_select = API_SELECT_FIELDS_ENABLED and not is_snapshot_mode()
+    return _fetch_collection(mission_ids, select=MISSION_SELECT_FIELDS if use_select else None)
+
+
+def _fetch_mission_versions(mission_ids):
+    """
+    通过集合接口只获取任务的版本信息，用于低成本地重新验证缓存
+    :param mission_ids: 任务ID列表
+    :return: {任务ID: (lockVersion, updatedAt)}
+    """
+    elements = _fetch_collection(
+        mission_ids, select='elements/id,elements/lockVersion,elements/updatedAt')
+    return {
+        str(element['id']): (element.get('lockVersion'), element.get('updatedAt'))
+        for element in elements if isinstance(element, dict) and 'id' in element
     }
 
-    response = requests.get(url, headers=headers)
-    return response.json()
+
+def _store_missions(missions, persist=True):
+    """
+    将接口返回的任务详情投影为 MissionInfo 后写入本次运行的缓存，并按需写入持久化缓存
+    :param missions: [(任务详情字典, ETag), ...]
+    :param persist: 是否写入持久化缓存
+    :return: MissionInfo 列表
+    """
+    missions = [(project_mission_info(mission_payload), etag) for mission_payload, etag in missions
+                if _is_valid_mission_info(mission_payload)]
+    with _mission_cache_lock:
+        for mission_info, _ in missions:
+            _mission_cache[mission_info.task_id] = mission_info
+
+    disk_cache = get_disk_cache()
+    if persist and disk_cache is not None:
+        disk_cache.put_many(missions)
+    return [mission_info for mission_info, _ in missions]
+
+
+def _load_from_disk_cache(mission_ids):
+    """
+    从持久化缓存中加载任务详情，有效期内的条目直接放入本次运行的缓存
+    :param mission_ids: 任务ID列表
+    :return: 已过期、需要重新验证的条目 {任务ID: CacheEntry}
+    """
+    disk_cache = get_disk_cache()
+    if disk_cache is None:
+        return {}
+
+    cache_entries = disk_cache.get_many(mission_ids)
+    fresh_entries = [entry for entry in cache_entries.values() if entry.is_fresh]
+    with _mission_cache_lock:
+        _cache_stats['disk_hit'] += len(fresh_entries)
+        for entry in fresh_entries:
+            _mission_cache[entry.mission_id] = load_cached_mission_info(entry.payload)
+
+    return {mission_id: entry for mission_id, entry in cache_entries.items() if not entry.is_fresh}
+
+
+def _revalidate_page(stale_entries):
+    """
+    批量重新验证过期条目，lockVersion 和 updatedAt 均未变化的条目继续使用
+    :param stale_entries: CacheEntry 列表
+    """
+    try:
+        mission_versions = _fetch_mission_versions(
+            [entry.mission_id for entry in stale_entries])
+    except Exception as e:
+        print(f"批量验证任务缓存失败，将重新获取：{e}")
+        return
+
+    unchanged_entries = [
+        entry for entry in stale_entries
+        if mission_versions.get(entry.mission_id) == (entry.lock_version, entry.updated_at)
+    ]
+    if not unchanged_entries:
+        return
+
+    get_disk_cache().touch([entry.mission_id for entry in unchanged_entries])
+    with _mission_cache_lock:
+        _cache_stats['revalidated'] += len(unchanged_entries)
+        for entry in unchanged_entries:
+            _mission_cache[entry.mission_id] = load_cached_mission_info(entry.payload)
+
+
+def _get_uncached_ids(mission_ids):
+    with _mission_cache_lock:
+        return list(dict.fromkeys(
+            str(mission_id) for mission_id in mission_ids
+            if mission_id and str(mission_id) not in _mission_cache
+        ))
+
+
+def _prefetch_mission_info_page(page_ids):
+    try:
+        elements = _fetch_mission_info_page(page_ids)
+    except Exception as e:
+        print(f"批量获取任务详情失败，将逐个获取：{e}")
+        return 0
+
+    with _mission_cache_lock:
+        _cache_stats['batch'] += 1
+    _store_missions([(mission_info, None) for mission_info in elements])
+    return len(elements)
+
+
+def _safe_get_mission_info(mission_id):
+    try:
+        get_mission_info(mission_id)
+    except Exception as e:
+        # 此处只做预取，异常留给后续校验/填充时再次请求并处理
+        print(f"获取任务详情失败 | 任务ID: {mission_id} | {e}")
+
+
+def _split_pages(items, page_size):
+    return [items[page_start:page_start + page_size]
+            for page_start in range(0, len(items), page_size)]
+
+
+@timed_stage('prefetch_mission_info')
+def prefetch_mission_info(mission_ids, page_size=BATCH_PAGE_SIZE, max_workers=FETCH_MAX_WORKERS):
+    """
+    并发预取任务详情写入缓存，之后的 get_mission_info 直接命中缓存
+    1. 持久化缓存中有效期内的任务直接使用，过期的任务批量比对版本信息，未变化则继续使用
+    2. 其余任务按页通过批量接口获取
+    3. 批量接口未返回（或未启用）的任务再逐个获取
+    :param mission_ids: 任务ID列表（可重复）
+    :param page_size: 每次批量请求的任务ID数量
+    :param max_workers: 并发线程数
+    :return: 预取后缓存中已有的任务数量
+    """
+    pending_ids = _get_uncached_ids(mission_ids)
+    if not pending_ids:
+        return 0
+
+    stale_entries = _load_from_disk_cache(pending_ids)
+
+    max_workers = max(1, max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if BATCH_FETCH_ENABLED:
+            if stale_entries:
+                list(executor.map(_revalidate_page,
+                     _split_pages(list(stale_entries.values()), page_size)))
+            list(executor.map(_prefetch_mission_info_page,
+                 _split_pages(_get_uncached_ids(pending_ids), page_size)))
+
+        list(executor.map(_safe_get_mission_info,
+             _get_uncached_ids(pending_ids)))
+
+    return len(pending_ids) - len(_get_uncached_ids(pending_ids))
+
+
+def _safe_fetch_mission_versions(page_ids):
+    try:
+        return _fetch_mission_versions(page_ids)
+    except Exception as e:
+        print(f"批量获取任务版本信息失败：{e}")
+        return {}
+
+
+@timed_stage('get_mission_versions')
+def get_mission_versions(mission_ids, page_size=BATCH_PAGE_SIZE, max_workers=FETCH_MAX_WORKERS):
+    """
+    批量获取任务的版本信息（只请求 id/lockVersion/updatedAt 字段），用于判断任务是否有变化
+    未启用批量接口或请求失败时，对应任务不在结果中
+    :param mission_ids: 任务ID列表（可重复）
+    :param page_size: 每次批量请求的任务ID数量
+    :param max_workers: 并发线程数
+    :return: {任务ID: (lockVersion, updatedAt)}
+    """
+    unique_ids = list(dict.fromkeys(str(mission_id) for mission_id in mission_ids if mission_id))
+    if not unique_ids or not BATCH_FETCH_ENABLED:
+        return {}
+
+    mission_versions = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for page_versions in executor.map(_safe_fetch_mission_versions, _split_pages(unique_ids, page_size)):
+            mission_versions.update(page_versions)
+    return mission_versions
+
+
+@timed_stage('get_mission_info')
+def get_mission_info(mission_id):
+    """
+    获取任务详情，同一任务ID在本次运行中只请求一次接口
+    持久化缓存中有效期内的任务直接使用，过期的任务带 ETag 发起条件请求
+    :param mission_id: 任务ID
+    :return: MissionInfo 对象，接口返回错误内容（如任务不存在）时为 None
+    """
+    cache_key = str(mission_id)
+    with _mission_cache_lock:
+        if cache_key in _mission_cache:
+            _cache_stats['hit'] += 1
+            return _mission_cache[cache_key]
+        _cache_stats['miss'] += 1
+
+    return _mission_coalescer.run(cache_key, lambda: _load_mission_info(cache_key))
+
+
+def _load_mission_info(cache_key):
+    # 等待合并请求期间，其他线程可能已写入缓存
+    with _mission_cache_lock:
+        if cache_key in _mission_cache:
+            return _mission_cache[cache_key]
+
+    disk_cache = get_disk_cache()
+    cache_entry = disk_cache.get(cache_key) if disk_cache is not None else None
+    if cache_entry is not None and cache_entry.is_fresh:
+        mission_info = load_cached_mission_info(cache_entry.payload)
+        with _mission_cache_lock:
+            _cache_stats['disk_hit'] += 1
+            _mission_cache[cache_key] = mission_info
+        return mission_info
+
+    mission_payload, etag = _fetch_mission_info(
+        cache_key, cache_entry.etag if cache_entry is not None else None)
+    if mission_payload is None:
+        # 304 未修改，继续使用缓存内容
+        disk_cache.touch([cache_key])
+        mission_info = load_cached_mission_info(cache_entry.payload)
+        with _mission_cache_lock:
+            _cache_stats['revalidated'] += 1
+            _mission_cache[cache_key] = mission_info
+        return mission_info
+
+    stored_missions = _store_missions([(mission_payload, etag)])
+    # 接口返回错误内容时不缓存，下次仍会重新请求
+    return stored_missions[0] if stored_missions else None
+
+
+def get_cache_stats():
+    """
+    获取任务详情缓存的命中统计
+    :return: {'hit': 命中次数, 'miss': 未命中次数, 'batch': 批量请求次数,
+              'disk_hit': 持久化缓存命中数, 'revalidated': 重新验证后复用数,
+              'coalesced': 合并的并发请求数, 'size': 缓存条数}
+    """
+    with _mission_cache_lock:
+        return {**_cache_stats, 'coalesced': _mission_coalescer.coalesced_count, 'size': len(_mission_cache)}
+
+
+def invalidate_missions(mission_ids):
+    """
+    使指定任务的缓存失效：移出本次运行的缓存，持久化缓存中的条目标记为过期，
+    下次获取时重新验证（版本信息或 ETag 未变化时仍可复用，不必重新下载）
+    :param mission_ids: 任务ID列表
+    """
+    mission_ids = list(dict.fromkeys(str(mission_id) for mission_id in mission_ids if mission_id))
+    if not mission_ids:
+        return
+
+    with _mission_cache_lock:
+        for mission_id in mission_ids:
+            _mission_cache.pop(mission_id, None)
+
+    disk_cache = get_disk_cache()
+    if disk_cache is not None:
+        disk_cache.expire(mission_ids)
+
+
+def clear_mission_cache():
+    with _mission_cache_lock:
+        _mission_cache.clear()
+        for stat_name in _cache_stats:
+            _cache_stats[stat_name] = 0
+        _mission_coalescer.coalesced_count = 0
+
+
+def print_cache_stats():
+    stats = get_cache_stats()
+    total = stats['hit'] + stats['miss']
+    if total:
+        print(f"任务详情缓存 | 命中: {stats['hit']} | 未命中: {stats['miss']} | "
+              f"命中率: {stats['hit'] / total:.1%} | 批量请求: {stats['batch']} | "
+              f"本地缓存命中: {stats['disk_hit']} | 验证后复用: {stats['revalidated']}")
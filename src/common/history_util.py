@@ -0,0 +1,182 @@
+import os
+import glob
+import sqlite3
+import datetime
+import threading
+from config.common import HISTORY_DB_PATH
+
+DEFAULT_HISTORY_DB_PATH = os.path.join(
+    os.path.expanduser('~'), '.niuma_helper', 'report_history.db')
+REPORT_FILE_PATTERN = os.path.join('**', '*周报.xlsx')
+REPORT_START_ROW = 5  # 与 auto_fill_reports.FILL_START_ROW 一致
+
+
+def _to_date_text(cell_value):
+    if isinstance(cell_value, (datetime.datetime, datetime.date)):
+        return cell_value.strftime('%Y-%m-%d')
+    return str(cell_value).strip()[:10] if cell_value else ''
+
+
+def _to_hours(cell_value):
+    try:
+        return float(cell_value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def read_report_rows(file_path):
+    """
+    以只读模式读取周报中的任务行（B:N 列），遇到ID为空的行即停止
+    :param file_path: 周报文件路径
+    :return: [(行号, 任务ID, 项目名称, 标题, 工作时长, 预计开始, 预计结束), ...]
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[0]
+        report_rows = []
+        for row_number, row_values in enumerate(
+                worksheet.iter_rows(min_row=REPORT_START_ROW, min_col=2, max_col=14, values_only=True),
+                REPORT_START_ROW):
+            project_name, task_id, task_title = row_values[0], row_values[1], row_values[2]
+            if task_id is None or str(task_id).strip() == '':
+                break
+            report_rows.append((
+                row_number,
+                str(task_id).strip(),
+                str(project_name or '').strip(),
+                str(task_title or '').strip(),
+                _to_hours(row_values[12]),
+                _to_date_text(row_values[6]),
+                _to_date_text(row_values[7])
+            ))
+        return report_rows
+    finally:
+        workbook.close()
+
+
+class ReportHistoryIndex:
+    """
+    历史周报索引：记录每个周报文件的修改时间，只重新读取有变化的文件
+    """
+
+    def __init__(self, db_path=''):
+        db_path = db_path or HISTORY_DB_PATH or DEFAULT_HISTORY_DB_PATH
+        db_dir_path = os.path.dirname(db_path)
+        if db_dir_path:
+            os.makedirs(db_dir_path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS report_files (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS report_rows (
+                path TEXT NOT NULL,
+                row_number INTEGER NOT NULL,
+                wp_id TEXT NOT NULL,
+                project TEXT,
+                title TEXT,
+                hours REAL,
+                start_date TEXT,
+                due_date TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_report_rows_wp_id ON report_rows (wp_id);
+            CREATE INDEX IF NOT EXISTS idx_report_rows_due_date ON report_rows (due_date);
+            CREATE INDEX IF NOT EXISTS idx_report_rows_path ON report_rows (path);
+        ''')
+        self._connection.commit()
+
+    def update(self, root_dir_path):
+        """
+        扫描目录下的所有周报，增量更新索引
+        :param root_dir_path: 周报根目录（TARGET_TEMPLATE_DIR_PATH）
+        :return: (重新索引的文件数, 移除的文件数)
+        """
+        current_files = {}
+        for file_path in glob.glob(os.path.join(root_dir_path, REPORT_FILE_PATTERN), recursive=True):
+            # 跳过Excel打开时生成的临时文件
+            if os.path.basename(file_path).startswith('~$'):
+                continue
+            file_stat = os.stat(file_path)
+            current_files[os.path.abspath(file_path)] = (file_stat.st_mtime, file_stat.st_size)
+
+        with self._lock:
+            indexed_files = {
+                path: (mtime, size) for path, mtime, size in
+                self._connection.execute('SELECT path, mtime, size FROM report_files')
+            }
+
+        changed_paths = [path for path, file_info in current_files.items()
+                         if indexed_files.get(path) != file_info]
+        removed_paths = [path for path in indexed_files if path not in current_files]
+
+        # 先在锁外读取表格，再一次性写入
+        changed_rows = {}
+        for file_path in changed_paths:
+            try:
+                changed_rows[file_path] = read_report_rows(file_path)
+            except Exception as e:
+                print(f"周报读取失败，已跳过：{file_path} | {e}")
+
+        with self._lock:
+            for file_path in removed_paths + list(changed_rows):
+                self._connection.execute('DELETE FROM report_rows WHERE path = ?', (file_path,))
+                self._connection.execute('DELETE FROM report_files WHERE path = ?', (file_path,))
+            for file_path, report_rows in changed_rows.items():
+                self._connection.executemany(
+                    'INSERT INTO report_rows VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    [(file_path, *report_row) for report_row in report_rows]
+                )
+                self._connection.execute(
+                    'INSERT INTO report_files VALUES (?, ?, ?)', (file_path, *current_files[file_path]))
+            self._connection.commit()
+
+        return len(changed_rows), len(removed_paths)
+
+    def find_reported(self, wp_ids, exclude_path=None):
+        """
+        查询任务是否已在历史周报中填报过
+        :param wp_ids: 任务ID列表
+        :param exclude_path: 排除的周报路径（通常是本周正在生成的周报）
+        :return: {任务ID: [(周报路径, 行号, 标题, 工作时长), ...]}
+        """
+        wp_ids = list(dict.fromkeys(str(wp_id) for wp_id in wp_ids if wp_id))
+        exclude_path = os.path.abspath(exclude_path) if exclude_path else ''
+        reported = {}
+        with self._lock:
+            for batch_start in range(0, len(wp_ids), 500):
+                batch_ids = wp_ids[batch_start:batch_start + 500]
+                placeholders = ','.join('?' * len(batch_ids))
+                for wp_id, path, row_number, title, hours in self._connection.execute(
+                        f'SELECT wp_id, path, row_number, title, hours FROM report_rows '
+                        f'WHERE wp_id IN ({placeholders}) AND path != ? ORDER BY path, row_number',
+                        (*batch_ids, exclude_path)):
+                    reported.setdefault(wp_id, []).append((path, row_number, title, hours))
+        return reported
+
+    def rollup_hours(self, start_date, end_date, group_by='project'):
+        """
+        按项目或任务汇总时间段内的工作时长（按预计结束日期筛选）
+        :param start_date: 开始日期（YYYY-MM-DD，含）
+        :param end_date: 结束日期（YYYY-MM-DD，含）
+        :param group_by: project 或 wp_id
+        :return: [(项目名称或任务ID, 总时长, 行数), ...]，按总时长降序
+        """
+        if group_by not in ('project', 'wp_id'):
+            raise ValueError(f"不支持的汇总维度：{group_by}")
+
+        with self._lock:
+            return self._connection.execute(
+                f'SELECT {group_by}, ROUND(SUM(hours), 2), COUNT(*) FROM report_rows '
+                f'WHERE due_date BETWEEN ? AND ? GROUP BY {group_by} ORDER BY SUM(hours) DESC',
+                (start_date, end_date)
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
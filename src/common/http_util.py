@@ -0,0 +1,199 @@
+import time
+import bisect
+import threading
+from common.metrics_util import record_http, HTTP_LATENCY_BUCKETS_MS
+from common.throttle_util import TokenBucket, AdaptiveConcurrencyLimiter, parse_retry_after
+from config.common import (
+    COOKIE,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_FACTOR,
+    HTTP_POOL_SIZE,
+    API_RATE_LIMIT,
+    API_RATE_BURST,
+    API_MIN_CONCURRENCY,
+    API_MAX_CONCURRENCY,
+    API_LATENCY_TARGET,
+    API_MAX_RETRY_AFTER
+)
+
+# 服务端限流时返回的状态码，由限流调度处理，不交给 urllib3 重试
+THROTTLE_STATUS_CODES = (429, 503)
+
+_session = None
+_session_lock = threading.Lock()
+
+_rate_limiter = TokenBucket(API_RATE_LIMIT, API_RATE_BURST)
+_concurrency_limiter = AdaptiveConcurrencyLimiter(
+    API_MIN_CONCURRENCY, API_MAX_CONCURRENCY, API_LATENCY_TARGET)
+
+# 请求耗时的累计统计，只保存计数、总耗时、最大耗时和固定分桶的直方图，常驻进程中不会随请求数增长
+_latency_stats = {
+    'count': 0,
+    'total': 0.0,
+    'max': 0.0,
+    'histogram': [0] * (len(HTTP_LATENCY_BUCKETS_MS) + 1)
+}
+_latency_lock = threading.Lock()
+
+
+def _create_session():
+    """
+    创建带连接池、重试和压缩的会话，复用TCP/TLS连接和Cookie请求头
+    :return: requests.Session 对象
+    """
+    # requests 导入较慢，首次发起请求时才导入，不影响只解析文本的命令的启动速度
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        connect=HTTP_MAX_RETRIES,
+        read=HTTP_MAX_RETRIES,
+        status=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=(500, 502, 504),
+        allowed_methods=frozenset(['GET']),
+        # 429/503 的 Retry-After 由 http_get 的限流调度处理
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE,
+        pool_maxsize=HTTP_POOL_SIZE,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'Cookie': COOKIE,
+        'Accept': 'application/json',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive'
+    })
+    return session
+
+
+def get_session():
+    """
+    获取进程内共享的会话（懒加载，线程安全）
+    :return: requests.Session 对象
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _create_session()
+    return _session
+
+
+def _send_get(url, params=None, headers=None):
+    start_time = time.perf_counter()
+    status_code = None
+    content_bytes = 0
+    try:
+        response = get_session().get(
+            url,
+            params=params,
+            headers=headers,
+            timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+        )
+        status_code = response.status_code
+        # 优先使用压缩后的传输大小
+        content_bytes = int(response.headers.get('Content-Length') or len(response.content))
+        return response
+    finally:
+        elapsed = time.perf_counter() - start_time
+        bucket_index = bisect.bisect_left(HTTP_LATENCY_BUCKETS_MS, elapsed * 1000)
+        with _latency_lock:
+            _latency_stats['count'] += 1
+            _latency_stats['total'] += elapsed
+            _latency_stats['max'] = max(_latency_stats['max'], elapsed)
+            _latency_stats['histogram'][bucket_index] += 1
+        record_http(status_code, elapsed, content_bytes)
+
+
+def http_get(url, params=None, headers=None):
+    """
+    通过共享会话发起GET请求，并记录本次请求耗时
+    请求前经过令牌桶限流和自适应并发上限；遇到 429/503 时按 Retry-After 等待后重试
+    :param url: 请求地址
+    :param params: 查询参数
+    :param headers: 额外请求头
+    :return: requests.Response 对象
+    """
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        _rate_limiter.acquire()
+        _concurrency_limiter.acquire()
+        start_time = time.perf_counter()
+        try:
+            response = _send_get(url, params, headers)
+        finally:
+            _concurrency_limiter.release()
+        elapsed = time.perf_counter() - start_time
+
+        if response.status_code not in THROTTLE_STATUS_CODES:
+            _concurrency_limiter.on_success(elapsed)
+            return response
+
+        _concurrency_limiter.on_throttle()
+        if attempt == HTTP_MAX_RETRIES:
+            return response
+
+        wait_seconds = parse_retry_after(
+            response.headers.get('Retry-After'),
+            default_seconds=HTTP_BACKOFF_FACTOR * (2 ** attempt),
+            max_seconds=API_MAX_RETRY_AFTER
+        )
+        time.sleep(wait_seconds)
+
+
+def get_concurrency_limit():
+    """
+    获取当前的自适应并发上限
+    """
+    return _concurrency_limiter.limit
+
+
+def _estimate_percentile(histogram, count, max_ms, percentile):
+    # 取累计数量达到该分位的分桶上限，超出最后一个分桶或大于最大耗时时取最大耗时
+    target_rank = min(count, int(count * percentile) + 1)
+    cumulative_count = 0
+    for bucket_ms, bucket_count in zip(HTTP_LATENCY_BUCKETS_MS, histogram):
+        cumulative_count += bucket_count
+        if cumulative_count >= target_rank:
+            return min(bucket_ms, max_ms)
+    return max_ms
+
+
+def get_latency_summary():
+    """
+    汇总请求耗时，P95 按直方图估算，为所在分桶的上限
+    :return: 包含请求数、总耗时、平均/最大/P95耗时（毫秒）的字典
+    """
+    with _latency_lock:
+        count = _latency_stats['count']
+        total = _latency_stats['total']
+        max_ms = _latency_stats['max'] * 1000
+        histogram = list(_latency_stats['histogram'])
+    if not count:
+        return {'count': 0, 'total_ms': 0.0, 'avg_ms': 0.0, 'max_ms': 0.0, 'p95_ms': 0.0}
+
+    return {
+        'count': count,
+        'total_ms': round(total * 1000, 2),
+        'avg_ms': round(total / count * 1000, 2),
+        'max_ms': round(max_ms, 2),
+        'p95_ms': round(_estimate_percentile(histogram, count, max_ms, 0.95), 2)
+    }
+
+
+def print_latency_summary():
+    summary = get_latency_summary()
+    if summary['count']:
+        print(f"接口请求 {summary['count']} 次 | 总耗时: {summary['total_ms']}ms | "
+              f"平均: {summary['avg_ms']}ms | P95: <={summary['p95_ms']}ms | 最大: {summary['max_ms']}ms")
@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import bisect
+import functools
+import threading
+from config.common import METRICS_ENABLED, METRICS_OUTPUT_PATH, METRICS_TRACE_PATH
+
+# HTTP耗时直方图的分桶上限（毫秒），最后一个桶收纳超出上限的请求
+HTTP_LATENCY_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+_enabled = METRICS_ENABLED
+_metrics_lock = threading.Lock()
+_origin_time = time.perf_counter()
+_stage_stats = {}  # {阶段名: {'count': 调用次数, 'total': 总耗时秒数, 'max': 最大耗时秒数}}
+_trace_events = []
+_http_stats = {
+    'count': 0,
+    'errors': 0,
+    'bytes': 0,
+    'total': 0.0,
+    'histogram': [0] * (len(HTTP_LATENCY_BUCKETS_MS) + 1)
+}
+
+
+def enable_metrics(enabled=True):
+    global _enabled
+    _enabled = enabled
+
+
+def is_metrics_enabled():
+    return _enabled
+
+
+def _record_stage(stage_name, start_time, elapsed):
+    with _metrics_lock:
+        stage_stat = _stage_stats.setdefault(stage_name, {'count': 0, 'total': 0.0, 'max': 0.0})
+        stage_stat['count'] += 1
+        stage_stat['total'] += elapsed
+        stage_stat['max'] = max(stage_stat['max'], elapsed)
+        _trace_events.append({
+            'name': stage_name,
+            'ph': 'X',
+            'ts': round((start_time - _origin_time) * 1e6),
+            'dur': round(elapsed * 1e6),
+            'pid': os.getpid(),
+            'tid': threading.get_ident()
+        })
+
+
+def timed_stage(stage_name):
+    """
+    统计被装饰函数的调用次数和耗时，未开启统计时直接调用原函数
+    :param stage_name: 阶段名称
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            start_time = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record_stage(stage_name, start_time, time.perf_counter() - start_time)
+        return wrapper
+    return decorator
+
+
+def record_http(status_code, elapsed, content_bytes):
+    """
+    记录一次HTTP请求
+    :param status_code: 状态码，请求异常时为 None
+    :param elapsed: 耗时（秒）
+    :param content_bytes: 响应体字节数
+    """
+    if not _enabled:
+        return
+
+    bucket_index = bisect.bisect_left(HTTP_LATENCY_BUCKETS_MS, elapsed * 1000)
+    with _metrics_lock:
+        _http_stats['count'] += 1
+        _http_stats['total'] += elapsed
+        _http_stats['bytes'] += content_bytes
+        _http_stats['histogram'][bucket_index] += 1
+        if status_code is None or status_code >= 400:
+            _http_stats['errors'] += 1
+
+
+def get_metrics():
+    """
+    获取统计结果
+    :return: 包含各阶段、HTTP、缓存统计的字典
+    """
+    # 延迟导入，避免与 cookie_util 循环依赖
+    from common.cookie_util import get_cache_stats
+
+    cache_stats = get_cache_stats()
+    cache_lookups = cache_stats['hit'] + cache_stats['miss']
+    with _metrics_lock:
+        stages = {
+            stage_name: {
+                'count': stage_stat['count'],
+                'total_ms': round(stage_stat['total'] * 1000, 2),
+                'avg_ms': round(stage_stat['total'] / stage_stat['count'] * 1000, 2),
+                'max_ms': round(stage_stat['max'] * 1000, 2)
+            }
+            for stage_name, stage_stat in _stage_stats.items()
+        }
+        bucket_labels = [f'<={bucket}ms' for bucket in HTTP_LATENCY_BUCKETS_MS] + \
+            [f'>{HTTP_LATENCY_BUCKETS_MS[-1]}ms']
+        http = {
+            'count': _http_stats['count'],
+            'errors': _http_stats['errors'],
+            'bytes': _http_stats['bytes'],
+            'total_ms': round(_http_stats['total'] * 1000, 2),
+            'histogram': dict(zip(bucket_labels, _http_stats['histogram']))
+        }
+
+    return {
+        'stages': stages,
+        'http': http,
+        'cache': {
+            **cache_stats,
+            'hit_rate': round(cache_stats['hit'] / cache_lookups, 4) if cache_lookups else None
+        }
+    }
+
+
+def print_metrics_summary():
+    metrics = get_metrics()
+
+    lines = [f"{'阶段':<28}{'次数':>8}{'总耗时ms':>12}{'平均ms':>10}{'最大ms':>10}"]
+    for stage_name, stage in sorted(metrics['stages'].items(), key=lambda item: -item[1]['total_ms']):
+        lines.append(f"{stage_name:<30}{stage['count']:>8}{stage['total_ms']:>14}"
+                     f"{stage['avg_ms']:>12}{stage['max_ms']:>12}")
+
+    http = metrics['http']
+    lines.append("-" * 80)
+    lines.append(f"HTTP请求: {http['count']} 次 | 失败: {http['errors']} 次 | "
+                 f"传输: {http['bytes'] / 1024:.1f}KB | 总耗时: {http['total_ms']}ms")
+    lines.append("耗时分布: " + ' | '.join(
+        f"{label}: {count}" for label, count in http['histogram'].items() if count))
+
+    cache = metrics['cache']
+    if cache['hit_rate'] is not None:
+        lines.append(f"缓存命中率: {cache['hit_rate']:.1%} | 命中: {cache['hit']} | 未命中: {cache['miss']}")
+    print('\n'.join(lines))
+
+
+def write_metrics_json(output_path):
+    with open(output_path, 'w', encoding='utf-8') as output_file:
+        json.dump(get_metrics(), output_file, ensure_ascii=False, indent=2)
+
+
+def write_chrome_trace(output_path):
+    """
+    输出 Chrome Trace 格式文件，可在 chrome://tracing 或 Perfetto 中查看
+    :param output_path: 输出文件路径
+    """
+    with _metrics_lock:
+        trace_events = list(_trace_events)
+    with open(output_path, 'w', encoding='utf-8') as output_file:
+        json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, output_file)
+
+
+def finish_metrics(output_path=METRICS_OUTPUT_PATH, trace_path=METRICS_TRACE_PATH):
+    """
+    运行结束时调用：开启统计时输出汇总表，并按配置写入JSON和Chrome Trace文件
+    """
+    if not _enabled:
+        return
+
+    print_metrics_summary()
+    if output_path:
+        write_metrics_json(output_path)
+    if trace_path:
+        write_chrome_trace(trace_path)
@@ -0,0 +1,118 @@
+import re
+from dataclasses import dataclass, asdict
+from common.time_util import convert_iso8601_to_hours
+
+# 描述中形如 <p class="op-uc-p">字段名：值</p> 的段落，一次扫描提取所有字段
+DESCRIPTION_FIELD_PATTERN = re.compile(r'<p class="op-uc-p">([^<：:]+?)[：:]\s*(.*?)</p>', re.S)
+LEADING_NUMBER_PATTERN = re.compile(r'\d+\.?\d*')
+
+# 描述中的字段名 -> MissionInfo 的属性名，值取开头的数字
+DESCRIPTION_NUMBER_FIELDS = {
+    '预估工时/时长': 'estimated_work_hours',
+}
+
+# 关联对象的字段名 -> MissionInfo 的属性名和缺失时的兜底文本
+LINKED_NAME_FIELDS = {
+    'status': ('status', "状态名称未知"),
+    'project': ('project', "项目名称未知"),
+    'responsible': ('responsible', "处理人未知"),
+    'type': ('category', "任务类型未知"),
+}
+
+# 开启字段选择时，批量接口只请求这些字段
+MISSION_SELECT_FIELDS = ','.join(f'elements/{field_name}' for field_name in (
+    'id', 'lockVersion', 'updatedAt', 'subject', 'description', 'startDate', 'dueDate',
+    'estimatedTime', 'customField1', *LINKED_NAME_FIELDS
+))
+
+
+@dataclass(slots=True)
+class MissionInfo:
+    """
+    任务详情中校验和填充用到的字段，在接口返回后立即从完整的 JSON 中提取，不保留其余内容
+    """
+    task_id: str
+    lock_version: int = None
+    updated_at: str = None
+    title: str = "接口未返回标题"
+    status: str = "状态名称未知"
+    project: str = "项目名称未知"
+    responsible: str = "处理人未知"
+    category: str = "任务类型未知"
+    start_date: str = "开始日期未知"
+    due_date: str = "截止日期未知"
+    self_estimated_hours: float = 0.0
+    estimated_work_hours: float = 0.0
+    completed_hours: float = 0.0
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, mission_dict):
+        return cls(**mission_dict)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def parse_description_fields(desc_html):
+    """
+    一次扫描任务描述，提取所有描述字段
+    :param desc_html: 任务描述 HTML
+    :return: {MissionInfo 属性名: 值}，未填写或无法解析的字段为 0.0
+    """
+    description_fields = dict.fromkeys(DESCRIPTION_NUMBER_FIELDS.values(), 0.0)
+    for field_match in DESCRIPTION_FIELD_PATTERN.finditer(desc_html or ''):
+        attr_name = DESCRIPTION_NUMBER_FIELDS.get(field_match.group(1).strip())
+        # 同名字段只取第一个
+        if attr_name is None or description_fields[attr_name]:
+            continue
+        number_match = LEADING_NUMBER_PATTERN.match(field_match.group(2))
+        description_fields[attr_name] = float(number_match.group()) if number_match else 0.0
+    return description_fields
+
+
+def _get_linked_name(mission_payload, field_name, default):
+    # 完整详情中关联对象在 _embedded 内；字段选择返回的只有 _links 中的 title
+    embedded_object = mission_payload.get('_embedded', {}).get(field_name)
+    if embedded_object is not None:
+        return embedded_object.get('name', default)
+    return mission_payload.get('_links', {}).get(field_name, {}).get('title', default)
+
+
+def project_mission_info(mission_payload):
+    """
+    将接口返回的任务详情投影为 MissionInfo
+    :param mission_payload: 接口返回的任务详情字典
+    :return: MissionInfo 对象
+    """
+    mission_info = MissionInfo(
+        task_id=str(mission_payload.get('id', "接口未返回ID")),
+        lock_version=mission_payload.get('lockVersion'),
+        updated_at=mission_payload.get('updatedAt'),
+        title=mission_payload.get('subject', "接口未返回标题"),
+        start_date=mission_payload.get('startDate', "开始日期未知"),
+        due_date=mission_payload.get('dueDate', "截止日期未知"),
+        self_estimated_hours=convert_iso8601_to_hours(mission_payload.get('estimatedTime', "")),
+        completed_hours=_to_float(mission_payload.get('customField1')),
+        **parse_description_fields((mission_payload.get('description') or {}).get('html', ''))
+    )
+    for field_name, (attr_name, default) in LINKED_NAME_FIELDS.items():
+        setattr(mission_info, attr_name, _get_linked_name(mission_payload, field_name, default))
+    return mission_info
+
+
+def load_cached_mission_info(cached_payload):
+    """
+    读取持久化缓存中的任务详情，兼容投影前写入的完整 JSON
+    :param cached_payload: 缓存中的字典
+    :return: MissionInfo 对象
+    """
+    if 'task_id' in cached_payload:
+        return MissionInfo.from_dict(cached_payload)
+    return project_mission_info(cached_payload)
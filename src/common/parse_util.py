@@ -0,0 +1,145 @@
+import io
+import re
+import sys
+from typing import NamedTuple
+from common.metrics_util import timed_stage
+from config.regex import WXWORK_FILL_URL
+
+# 正则在导入时编译一次，所有入口共用
+TASK_LINE_PATTERN = re.compile(WXWORK_FILL_URL)
+TASK_ID_PATTERN = re.compile(r'/wp/(\d+)')
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class TaskRecord(NamedTuple):
+    """
+    日报中的一条任务记录
+    """
+    serial: str  # 序号（行号）
+    self_hours: float  # 自评时长
+    project: str  # 项目名称
+    title: str  # 任务标题
+    url: str  # 任务链接
+    wp_id: str  # 从链接中提取的任务ID，提取失败为空字符串
+    line: str  # 原始文本行
+
+
+def get_task_id(task_link):
+    """
+    从任务链接中提取任务ID
+    :param task_link: 任务链接，如 https://xxx/wp/123
+    :return: 任务ID字符串，提取失败返回空字符串
+    """
+    task_link_match = TASK_ID_PATTERN.search(task_link)
+    if not task_link_match:
+        return ""
+    return str(int(task_link_match.group(1)))
+
+
+def parse_task_line(line):
+    """
+    解析单行日报文本
+    :param line: 去除首尾空白后的文本行
+    :return: TaskRecord，格式不符时返回 None
+    """
+    line_match = TASK_LINE_PATTERN.match(line)
+    if not line_match:
+        return None
+
+    try:
+        self_hours = float(line_match.group(2))
+    except ValueError:
+        return None
+
+    task_url = line_match.group(5).strip()
+    return TaskRecord(
+        serial=line_match.group(1).strip(),
+        self_hours=self_hours,
+        project=line_match.group(3).strip(),
+        title=line_match.group(4).strip(),
+        url=task_url,
+        wp_id=get_task_id(task_url),
+        line=line
+    )
+
+
+def iter_task_records(lines, on_unrecognized=None):
+    """
+    逐行解析日报文本，惰性返回任务记录
+    :param lines: 可迭代的文本行（列表、文件对象、生成器等）
+    :param on_unrecognized: 遇到无法识别的非空行时的回调，参数为该行文本
+    :return: TaskRecord 生成器
+    """
+    for line in lines:
+        trim_line = line.strip()
+        if not trim_line:
+            continue
+
+        task_record = parse_task_line(trim_line)
+        if task_record is not None:
+            yield task_record
+        elif on_unrecognized is not None:
+            on_unrecognized(trim_line)
+
+
+def iter_file_lines(file_obj, chunk_size=READ_CHUNK_SIZE):
+    """
+    按块读取文件并逐行返回，内存占用与文件大小无关
+    :param file_obj: 文本模式打开的文件对象
+    :param chunk_size: 每次读取的字符数
+    :return: 文本行生成器
+    """
+    remainder = ''
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if not chunk:
+            break
+        lines = (remainder + chunk).split('\n')
+        remainder = lines.pop()
+        yield from lines
+    if remainder:
+        yield remainder
+
+
+def iter_source_lines(source):
+    """
+    从文件路径或标准输入按块读取文本行
+    :param source: 文件路径，'-' 表示标准输入
+    :return: 文本行生成器
+    """
+    if source == '-':
+        yield from iter_file_lines(sys.stdin)
+        return
+
+    with open(source, encoding='utf-8') as source_file:
+        yield from iter_file_lines(source_file)
+
+
+@timed_stage('parse_tasks')
+def parse_task_lines(lines, on_unrecognized=None):
+    """
+    解析日报文本行，可直接传入 iter_source_lines 流式读取的文件或标准输入
+    :param lines: 可迭代的文本行
+    :param on_unrecognized: 遇到无法识别的非空行时的回调
+    :return: (TaskRecord 列表, 未识别的文本行列表)
+    """
+    unrecognized_lines = []
+
+    def collect_unrecognized(line):
+        unrecognized_lines.append(line)
+        if on_unrecognized is not None:
+            on_unrecognized(line)
+
+    task_records = list(iter_task_records(lines, collect_unrecognized))
+    return task_records, unrecognized_lines
+
+
+def parse_tasks(text, on_unrecognized=None):
+    """
+    解析整段日报文本
+    :param text: 待解析的原始文本
+    :param on_unrecognized: 遇到无法识别的非空行时的回调
+    :return: (TaskRecord 列表, 未识别的文本行列表)
+    """
+    return parse_task_lines(io.StringIO(text), on_unrecognized)
@@ -0,0 +1,82 @@
+import sys
+import json
+from common.print_util import colored
+
+
+def render_console(result):
+    """
+    以彩色文本输出单个任务的校验结果
+    :param result: MissionCheckResult 对象
+    """
+    lines = []
+    if result.category:
+        lines.append(f"任务类型   ：{result.category}")
+        lines.append(f"行号       ：{result.line_number}")
+        lines.append(f"项目名称   ：{result.project_name}")
+        lines.append(f"任务标题   ：{result.title}")
+        lines.append(f"任务ID     ：{result.task_id}")
+
+    for _, message in result.errors:
+        lines.append(colored(message, 'red'))
+
+    if result.passed:
+        lines.append(colored("校验通过", 'green'))
+
+    # 获取详情失败时与原有输出保持一致，不输出分隔线
+    if result.category:
+        lines.append("=" * 80 + " \n")
+
+    print('\n'.join(lines))
+
+
+def render_jsonl(results, file=None):
+    """
+    以JSON Lines格式输出校验结果，所有结果拼接后一次写入
+    :param results: MissionCheckResult 列表
+    :param file: 输出的文件对象，默认标准输出
+    """
+    file = file or sys.stdout
+    file.write(''.join(
+        json.dumps(result.to_dict(), ensure_ascii=False) + '\n' for result in results))
+    file.flush()
+
+
+def render_summary(results):
+    """
+    以表格形式输出校验结果汇总
+    :param results: MissionCheckResult 列表
+    """
+    failed_results = [result for result in results if not result.passed]
+
+    # 检查多个表格时行号带有文件名前缀，行号列按最长的行号加宽
+    line_number_width = max([8] + [len(str(result.line_number)) + 2 for result in results])
+    lines = [f"{'行号':<{line_number_width - 2}}{'任务ID':<10}{'结果':<6}未通过规则"]
+    for result in results:
+        status_text = colored('通过', 'green') if result.passed else colored('异常', 'red')
+        failed_rules = ', '.join(rule for rule, _ in result.errors)
+        lines.append(f"{result.line_number:<{line_number_width}}{result.task_id:<12}{status_text:<6}  {failed_rules}")
+
+    lines.append("-" * 80)
+    lines.append(f"共 {len(results)} 条 | 通过: {len(results) - len(failed_results)} 条 | "
+                 f"异常: {len(failed_results)} 条")
+    print('\n'.join(lines))
+
+
+def render_results(results, output_format='console', output_path=''):
+    """
+    按指定格式输出全部校验结果
+    :param results: MissionCheckResult 列表
+    :param output_format: console（逐条彩色输出）、jsonl、summary（汇总表）
+    :param output_path: jsonl 格式的输出文件路径，为空时输出到标准输出
+    """
+    if output_format == 'jsonl':
+        if output_path:
+            with open(output_path, 'w', encoding='utf-8') as output_file:
+                render_jsonl(results, output_file)
+        else:
+            render_jsonl(results)
+    elif output_format == 'summary':
+        render_summary(results)
+    else:
+        for result in results:
+            render_console(result)
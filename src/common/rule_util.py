@@ -0,0 +1,178 @@
+import re
+import json
+import importlib
+import threading
+from typing import NamedTuple
+from common.time_util import get_week_date_range
+from config.common import MISSION_TYPE, HANDLER_NAME, CHECK_RULES, CUSTOM_CHECK_RULES
+
+# 正则在导入时编译一次
+ISO_DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+class RuleContext(NamedTuple):
+    """
+    编译规则时确定的校验参数，一次运行内所有任务共用
+    """
+    week_start: str
+    week_end: str
+    statuses: frozenset
+    handler_name: str
+    check_date: bool
+
+
+# 规则注册表：{规则名: 规则函数}，按注册顺序执行
+# 规则函数签名为 (task_record, mission_info, context)，未通过时返回错误说明，通过时返回 None
+RULE_REGISTRY = {}
+
+
+def register_rule(rule_name):
+    """
+    注册校验规则的装饰器
+    :param rule_name: 规则名，与校验结果中的规则名一致
+    """
+    def decorator(rule_func):
+        RULE_REGISTRY[rule_name] = rule_func
+        return rule_func
+    return decorator
+
+
+@register_rule('task_id')
+def check_task_id(task_record, mission_info, context):
+    if task_record.wp_id != mission_info.task_id:
+        return f"任务ID不一致 | 预期: {task_record.wp_id} | 实际: {mission_info.task_id}"
+
+
+@register_rule('title')
+def check_title(task_record, mission_info, context):
+    if mission_info.title != task_record.title:
+        return f"任务标题不一致 | 预期: {task_record.title} | 实际: {mission_info.title}"
+
+
+@register_rule('status')
+def check_status(task_record, mission_info, context):
+    if mission_info.status not in context.statuses:
+        return f"任务状态异常 | 预期: {'/'.join(sorted(context.statuses))} | 实际: {mission_info.status}"
+
+
+@register_rule('project')
+def check_project(task_record, mission_info, context):
+    if mission_info.project != task_record.project:
+        return f"项目名称不一致 | 预期: {task_record.project} | 实际: {mission_info.project}"
+
+
+@register_rule('self_hours')
+def check_self_hours(task_record, mission_info, context):
+    if mission_info.self_estimated_hours != task_record.self_hours:
+        return (f"自评时长不一致 | 预期: {task_record.self_hours:g}h | "
+                f"实际: {mission_info.self_estimated_hours}h")
+
+
+@register_rule('handler')
+def check_handler(task_record, mission_info, context):
+    if mission_info.responsible != context.handler_name:
+        return f"处理人不一致 | 预期: {context.handler_name} | 实际: {mission_info.responsible}"
+
+
+def _is_date_in_week(date_str, context):
+    # YYYY-MM-DD 格式的日期按字符串比较即可，无需逐个解析
+    return bool(date_str) and ISO_DATE_PATTERN.fullmatch(date_str) is not None \
+        and context.week_start <= date_str <= context.week_end
+
+
+@register_rule('week_range')
+def check_week_range(task_record, mission_info, context):
+    if not (_is_date_in_week(mission_info.start_date, context) and _is_date_in_week(mission_info.due_date, context)):
+        return f"超出本周范围 | 开始日期: {mission_info.start_date} | 截止日期: {mission_info.due_date}"
+
+
+@register_rule('estimated_hours')
+def check_estimated_hours(task_record, mission_info, context):
+    if mission_info.estimated_work_hours <= 0:
+        return f"预估工时异常 | 实际: {mission_info.estimated_work_hours}h"
+
+
+def _load_custom_rule(rule_path):
+    """
+    加载配置中的自定义规则
+    :param rule_path: '模块路径:函数名'
+    :return: (规则名, 规则函数)，规则名为函数名
+    """
+    module_name, _, func_name = rule_path.partition(':')
+    rule_func = getattr(importlib.import_module(module_name), func_name)
+    return func_name, rule_func
+
+
+class CompiledRuleSet:
+    """
+    编译后的规则集：启用的规则和校验参数在编译时确定，之后对每个任务直接执行
+    """
+
+    def __init__(self, rules, context):
+        """
+        :param rules: [(规则名, 规则函数), ...]
+        :param context: RuleContext 对象
+        """
+        self.rules = rules
+        self.context = context
+        # 规则集指纹：处理人、合法状态、本周范围或启用的规则变化时随之变化，用于判断上次的校验结果能否复用
+        self.fingerprint = json.dumps({
+            'context': {**context._asdict(), 'statuses': sorted(context.statuses)},
+            'rules': [rule_name for rule_name, _ in rules]
+        }, sort_keys=True, ensure_ascii=False)
+
+    def evaluate(self, task_record, mission_info):
+        """
+        对单个任务执行所有规则
+        :return: 未通过的规则列表：[(规则名, 说明), ...]
+        """
+        errors = []
+        for rule_name, rule_func in self.rules:
+            message = rule_func(task_record, mission_info, self.context)
+            if message:
+                errors.append((rule_name, message))
+        return errors
+
+
+# 按（校验选项, 本周一）缓存编译结果，跨周运行时自动重新编译
+_compiled_rule_sets = {}
+_compiled_rule_sets_lock = threading.Lock()
+
+
+def compile_rules(option):
+    """
+    根据校验选项编译规则集
+    :param option: 校验选项，check_date 为 False 时不校验起止日期，handler_name 指定预期处理人（默认 HANDLER_NAME）
+    :return: CompiledRuleSet 对象
+    """
+    current_week_mon, current_week_sun = get_week_date_range()
+    cache_key = (json.dumps(option, sort_keys=True, ensure_ascii=False), current_week_mon)
+    rule_set = _compiled_rule_sets.get(cache_key)
+    if rule_set is not None:
+        return rule_set
+
+    context = RuleContext(
+        week_start=current_week_mon.isoformat(),
+        week_end=current_week_sun.isoformat(),
+        statuses=frozenset(MISSION_TYPE),
+        handler_name=option.get('handler_name', HANDLER_NAME),
+        check_date=option.get('check_date', True)
+    )
+
+    enabled_rule_names = CHECK_RULES or list(RULE_REGISTRY)
+    rules = [(rule_name, RULE_REGISTRY[rule_name]) for rule_name in enabled_rule_names
+             if rule_name != 'week_range' or context.check_date]
+    rules.extend(_load_custom_rule(rule_path) for rule_path in CUSTOM_CHECK_RULES)
+
+    rule_set = CompiledRuleSet(rules, context)
+    with _compiled_rule_sets_lock:
+        _compiled_rule_sets[cache_key] = rule_set
+    return rule_set
+
+
+def clear_compiled_rules():
+    """
+    清空规则集缓存，修改注册表后调用
+    """
+    with _compiled_rule_sets_lock:
+        _compiled_rule_sets.clear()
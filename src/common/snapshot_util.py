@@ -0,0 +1,113 @@
+import os
+import gzip
+import json
+import atexit
+import threading
+from config.common import SNAPSHOT_MODE, SNAPSHOT_PATH
+
+# 快照文件为 gzip 压缩的 JSON Lines，每行一个任务详情
+
+
+class SnapshotRecorder:
+    """
+    录制模式：将接口返回的任务详情追加写入快照文件，同一任务只记录一次
+    """
+
+    def __init__(self, snapshot_path):
+        snapshot_dir_path = os.path.dirname(snapshot_path)
+        if snapshot_dir_path:
+            os.makedirs(snapshot_dir_path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._recorded_ids = set(load_snapshot(snapshot_path)) if os.path.exists(snapshot_path) else set()
+        self._snapshot_file = gzip.open(snapshot_path, 'at', encoding='utf-8')
+        atexit.register(self.close)
+
+    def record(self, mission_info):
+        if not isinstance(mission_info, dict) or 'id' not in mission_info:
+            return
+
+        mission_id = str(mission_info['id'])
+        with self._lock:
+            if mission_id in self._recorded_ids or self._snapshot_file.closed:
+                return
+            self._recorded_ids.add(mission_id)
+            self._snapshot_file.write(json.dumps(mission_info, ensure_ascii=False) + '\n')
+
+    def close(self):
+        with self._lock:
+            if not self._snapshot_file.closed:
+                self._snapshot_file.close()
+
+
+def load_snapshot(snapshot_path):
+    """
+    读取快照文件
+    :param snapshot_path: 快照文件路径
+    :return: {任务ID: 任务详情字典}
+    """
+    missions = {}
+    with gzip.open(snapshot_path, 'rt', encoding='utf-8') as snapshot_file:
+        for line in snapshot_file:
+            if line.strip():
+                mission_info = json.loads(line)
+                missions[str(mission_info['id'])] = mission_info
+    return missions
+
+
+_recorder = None
+_replay_missions = None
+_snapshot_lock = threading.Lock()
+
+
+def is_snapshot_mode():
+    return SNAPSHOT_MODE in ('record', 'replay')
+
+
+def is_replay_mode():
+    return SNAPSHOT_MODE == 'replay'
+
+
+def record_missions(missions):
+    """
+    录制模式下记录任务详情，其他模式不做任何事
+    :param missions: 任务详情字典列表
+    """
+    global _recorder
+    if SNAPSHOT_MODE != 'record':
+        return
+    if _recorder is None:
+        with _snapshot_lock:
+            if _recorder is None:
+                _recorder = SnapshotRecorder(SNAPSHOT_PATH)
+    for mission_info in missions:
+        _recorder.record(mission_info)
+
+
+def get_replay_missions():
+    """
+    回放模式下获取快照中的全部任务详情
+    :return: {任务ID: 任务详情字典}
+    """
+    global _replay_missions
+    if _replay_missions is None:
+        with _snapshot_lock:
+            if _replay_missions is None:
+                _replay_missions = load_snapshot(SNAPSHOT_PATH)
+    return _replay_missions
+
+
+def replay_mission_info(mission_id):
+    """
+    回放单个任务详情，快照中不存在时返回与接口一致的错误结构
+    :param mission_id: 任务ID
+    :return: 任务详情字典
+    """
+    mission_info = get_replay_missions().get(str(mission_id))
+    if mission_info is None:
+        return {
+            '_type': 'Error',
+            'errorIdentifier': 'urn:openproject-org:api:v3:errors:NotFound',
+            'message': f'快照中不存在任务 {mission_id}'
+        }
+    return mission_info
@@ -0,0 +1,61 @@
+import os
+import json
+import hashlib
+
+DEFAULT_STATE_DIR_PATH = os.path.join(os.path.expanduser('~'), '.niuma_helper')
+
+
+def get_state_path(scope, state_dir_path=''):
+    """
+    获取增量检查状态文件路径，每个检查入口（scope）各用一个文件
+    :param scope: 检查入口名称，如 check_reports
+    :param state_dir_path: 状态文件目录，为空时使用 ~/.niuma_helper
+    :return: 状态文件路径
+    """
+    return os.path.join(state_dir_path or DEFAULT_STATE_DIR_PATH, f'check_state_{scope}.json')
+
+
+def get_line_key(task_record, rule_fingerprint):
+    """
+    计算任务行的指纹：行内容、任务ID和规则集任一变化都会得到新的指纹
+    :param task_record: TaskRecord 任务记录
+    :param rule_fingerprint: CompiledRuleSet.fingerprint，已包含校验选项、本周范围、处理人、合法状态和启用的规则
+    :return: 指纹字符串
+    """
+    line_content = task_record.line or '\t'.join(
+        (task_record.serial, str(task_record.self_hours), task_record.project, task_record.title, task_record.url))
+    key_source = '\n'.join((
+        line_content,
+        task_record.wp_id,
+        rule_fingerprint
+    ))
+    return hashlib.sha1(key_source.encode('utf-8')).hexdigest()
+
+
+def load_state(state_path):
+    """
+    读取状态文件
+    :return: {指纹: {'result': 校验结果字典, 'version': [lockVersion, updatedAt]}}
+    """
+    if not os.path.exists(state_path):
+        return {}
+    try:
+        with open(state_path, encoding='utf-8') as state_file:
+            return json.load(state_file)
+    except (OSError, ValueError) as e:
+        print(f"增量检查状态文件读取失败，将全部重新检查：{e}")
+        return {}
+
+
+def save_state(state_path, state):
+    """
+    写入状态文件，先写临时文件再替换，避免中断时损坏
+    """
+    state_dir_path = os.path.dirname(state_path)
+    if state_dir_path:
+        os.makedirs(state_dir_path, exist_ok=True)
+
+    temp_state_path = f'{state_path}.tmp'
+    with open(temp_state_path, 'w', encoding='utf-8') as state_file:
+        json.dump(state, state_file, ensure_ascii=False)
+    os.replace(temp_state_path, state_path)
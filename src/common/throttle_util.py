@@ -0,0 +1,146 @@
+import time
+import threading
+import email.utils
+
+
+class TokenBucket:
+    """
+    令牌桶限流：平均每秒最多 rate 个请求，允许 capacity 个请求的突发
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        获取一个令牌，令牌不足时阻塞等待；rate 小于等于 0 时不限流
+        """
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD 自适应并发上限：
+    - 请求成功且耗时未超过目标值时，每完成约 limit 个请求上限加 1（加性增）
+    - 遇到限流（429/503）或耗时超过目标值时，上限减半（乘性减）
+    """
+
+    def __init__(self, min_limit, max_limit, latency_target):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_target = latency_target
+        self._limit = float(self.max_limit)
+        self._in_flight = 0
+        self._last_decrease_at = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    def acquire(self):
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def on_success(self, latency):
+        with self._condition:
+            if self.latency_target and latency > self.latency_target:
+                self._decrease()
+            else:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def on_throttle(self):
+        with self._condition:
+            self._decrease()
+
+    def _decrease(self):
+        # 同一批并发请求同时被限流时只减半一次
+        now = time.monotonic()
+        if now - self._last_decrease_at < 1:
+            return
+        self._last_decrease_at = now
+        self._limit = max(self.min_limit, self._limit / 2)
+
+
+def parse_retry_after(header_value, default_seconds=1.0, max_seconds=30.0):
+    """
+    解析 Retry-After 响应头，支持秒数和HTTP日期两种格式
+    :param header_value: 响应头的值
+    :param default_seconds: 响应头缺失或无法解析时的等待秒数
+    :param max_seconds: 等待秒数上限
+    :return: 需要等待的秒数
+    """
+    if not header_value:
+        return default_seconds
+
+    try:
+        wait_seconds = float(header_value)
+    except ValueError:
+        try:
+            retry_datetime = email.utils.parsedate_to_datetime(header_value)
+        except (TypeError, ValueError):
+            return default_seconds
+        wait_seconds = retry_datetime.timestamp() - time.time()
+
+    return min(max_seconds, max(0.0, wait_seconds))
+
+
+class InFlightCoalescer:
+    """
+    合并对同一个键的并发调用：第一个调用者执行，其余调用者等待并共享同一结果
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.coalesced_count = 0  # 被合并（未实际执行）的调用次数
+
+    def run(self, key, func):
+        with self._lock:
+            pending = self._in_flight.get(key)
+            is_leader = pending is None
+            if is_leader:
+                pending = self._in_flight[key] = {'event': threading.Event()}
+            else:
+                self.coalesced_count += 1
+
+        if not is_leader:
+            pending['event'].wait()
+            if 'error' in pending:
+                raise pending['error']
+            return pending['result']
+
+        try:
+            pending['result'] = func()
+            return pending['result']
+        except Exception as e:
+            pending['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            pending['event'].set()
@@ -1,6 +1,10 @@
 import re
 import datetime
 
+# 正则在导入时编译一次
+ISO8601_HOUR_PATTERN = re.compile(r'(\d+)H')
+ISO8601_MINUTE_PATTERN = re.compile(r'(\d+)M(?!S)')
+
 
 def convert_iso8601_to_hours(duration_str: str) -> float:
     """
@@ -16,10 +20,10 @@ def convert_iso8601_to_hours(duration_str: str) -> float:
     if not duration_str or not duration_str.startswith('PT'):
         return 0.0
     # 提取小时数（匹配数字+H的组合，没有则为0）
-    hour_match = re.search(r'(\d+)H', duration_str)
+    hour_match = ISO8601_HOUR_PATTERN.search(duration_str)
     hours = int(hour_match.group(1)) if hour_match else 0
     # 提取分钟数（匹配数字+M且M后面不是S，避免和秒的M混淆，没有则为0）
-    minute_match = re.search(r'(\d+)M(?!S)', duration_str)
+    minute_match = ISO8601_MINUTE_PATTERN.search(duration_str)
     minutes = int(minute_match.group(1)) if minute_match else 0
     # 分钟转小时（除以60）后和小时数相加
     total_hours = hours + minutes / 60
@@ -64,6 +68,18 @@ def get_week_date_range():
     return monday, sunday
 
 
+def parse_iso_date(date_str):
+    """
+    将 YYYY-MM-DD 格式的日期字符串转换为 date 对象，写入表格时按日期而非文本处理
+    :param date_str: 日期字符串
+    :return: date 对象，无法解析时原样返回
+    """
+    try:
+        return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return date_str
+
+
 def date_in_week(date_str, monday, sunday):
     """
     校验日期是否在本周范围内
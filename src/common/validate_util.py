@@ -1,8 +1,13 @@
-import re
-from common.cookie_util import get_mission_info
-from common.time_util import convert_iso8601_to_hours, get_week_date_range, date_in_week
-from config.common import MISSION_TYPE, HANDLER_NAME
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor
+from common.cookie_util import get_mission_info, prefetch_mission_info, get_mission_versions, invalidate_missions
+from common.state_util import get_line_key, load_state, save_state
+from common.rule_util import compile_rules
+from common.mission_util import MissionInfo
+from config.common import FETCH_MAX_WORKERS, CHECK_OUTPUT_FORMAT, CHECK_OUTPUT_PATH
 from common.print_util import colored
+from common.render_util import render_console, render_results
+from common.metrics_util import timed_stage
 
 
 def check_url(line):
@@ -15,135 +20,233 @@ def check_url(line):
     print(colored(f"{line}\n{reason}\n", 'yellow'))
 
 
-def get_estimated_work_hours(task_data):
-    desc_html = task_data['description']['html']
-
-    self_estimated_hours = task_data['estimatedTime']
-    self_estimated_hours = convert_iso8601_to_hours(self_estimated_hours)
-
-    work_hours_pattern = r'<p class="op-uc-p">预估工时/时长[：:]\s*(\d+\.?\d*).*?</p>'
-    work_hours_match = re.search(work_hours_pattern, desc_html, re.S)
-    estimated_work_hours_str = work_hours_match.group(
-        1).strip() if work_hours_match else ''
-
-    try:
-        estimated_work_hours = float(estimated_work_hours_str)
-    except ValueError:
-        estimated_work_hours = 0.0
-
-    return estimated_work_hours
-
-
-def check_mission(task_match, option):
-    is_task_valid = True
-    current_week_mon, current_week_sun = get_week_date_range()
-
-    # 提取正则匹配的任务基础信息
-    line_number = task_match.group(1).strip()
-    task_estimated_hours_str = task_match.group(2).strip()
-    task_project_name = task_match.group(3).strip()
-    task_title = task_match.group(4).strip()
-    task_link = task_match.group(5).strip()
-
-    # 从任务链接提取任务ID
-    task_link_match = re.search(r'/wp/(\d+)', task_link)
-    if task_link_match:
-        try:
-            task_id_from_link = str(int(task_link_match.group(1).strip()))
-        except (ValueError, TypeError):
-            task_id_from_link = "链接ID解析失败"
+def prefetch_missions(task_records, max_workers=FETCH_MAX_WORKERS):
+    """
+    收集所有任务的ID，批量、并发地预取任务详情
+    :param task_records: TaskRecord 列表
+    :param max_workers: 并发线程数
+    :return: 成功预取的任务数量
+    """
+    task_ids = [task_record.wp_id for task_record in task_records]
+    return prefetch_mission_info(task_ids, max_workers=max_workers)
+
+
+@dataclass(slots=True)
+class MissionCheckResult:
+    """
+    单个任务的校验结果
+    errors 为未通过的规则列表：[(规则名, 说明), ...]，为空表示校验通过
+    """
+    line_number: str
+    task_id: str = ''
+    category: str = ''
+    project_name: str = ''
+    title: str = ''
+    link: str = ''
+    self_hours: float = 0.0
+    status: str = ''
+    responsible: str = ''
+    start_date: str = ''
+    due_date: str = ''
+    estimated_work_hours: float = 0.0
+    errors: list = field(default_factory=list)
+
+    @property
+    def passed(self):
+        return not self.errors
+
+    def __bool__(self):
+        return self.passed
+
+    def add_error(self, rule, message):
+        self.errors.append((rule, message))
+
+    def to_dict(self):
+        result_dict = asdict(self)
+        result_dict['passed'] = self.passed
+        return result_dict
+
+    @classmethod
+    def from_dict(cls, result_dict):
+        field_values = {key: value for key, value in result_dict.items() if key != 'passed'}
+        field_values['errors'] = [tuple(error) for error in field_values.get('errors', [])]
+        return cls(**field_values)
+
+
+def _prepare_mission(task_record):
+    """
+    创建校验结果并获取任务详情，链接ID解析失败或详情获取失败时直接记录错误
+    :param task_record: TaskRecord 任务记录
+    :return: (MissionCheckResult 对象, MissionInfo 对象)，无法继续校验时 MissionInfo 为 None
+    """
+    line_number = task_record.serial
+    task_id_from_link = task_record.wp_id
+    result = MissionCheckResult(
+        line_number=line_number,
+        task_id=task_id_from_link,
+        project_name=task_record.project,
+        title=task_record.title,
+        link=task_record.url,
+        self_hours=task_record.self_hours
+    )
+
+    # 校验任务链接中的ID
+    if not task_id_from_link:
+        result.add_error('link_id', f"链接ID解析失败 | 行号: {line_number} | 链接: {task_record.url}")
+        return result, None
 
     # 获取任务详情
-    task_detail = get_mission_info(task_id_from_link)
-    if not task_detail or not isinstance(task_detail, dict):
-        print(
-            colored(f"任务详情获取失败 | 行号: {line_number} | 链接提取ID: {task_id_from_link}", 'red'))
-        return False
-
-    embedded_data = task_detail.get('_embedded', {})  # 兜底空字典
-    task_status = embedded_data.get('status', {})       # 兜底空字典
-    task_project = embedded_data.get('project', {})     # 兜底空字典
-    task_responsible = embedded_data.get('responsible', {})  # 兜底空字典
-    task_category = embedded_data.get('type', {})       # 兜底空字典
-
-    # 任务核心基础信息
-    actual_task_id = str(task_detail.get('id', "接口未返回ID"))
-    actual_task_title = task_detail.get('subject', "接口未返回标题")
-    raw_self_estimated_hours = task_detail.get('estimatedTime', "")
-
-    # 业务维度详情信息
-    task_status_name = task_status.get('name', "状态名称未知")
-    actual_project_name = task_project.get('name', "项目名称未知")
-    actual_responsible_name = task_responsible.get('name', "处理人未知")
-    task_start_date = task_detail.get('startDate', "开始日期未知")
-    task_due_date = task_detail.get('dueDate', "截止日期未知")
-    task_category_name = task_category.get('name', "任务类型未知")
-
-    print(f"任务类型   ：{task_category_name}")
-    print(f"行号       ：{line_number}")
-    print(f"项目名称   ：{task_project_name}")
-    print(f"任务标题   ：{task_title}")
-    print(f"任务ID     ：{actual_task_id}")
-
-    # 校验任务ID一致性
-    if task_id_from_link != actual_task_id:
-        print(
-            colored(f"任务ID不一致 | 预期: {task_id_from_link} | 实际: {actual_task_id}", 'red'))
-        is_task_valid = False
-
-    # 校验任务标题一致性
-    if actual_task_title != task_title:
-        print(
-            colored(f"任务标题不一致 | 预期: {task_title} | 实际: {actual_task_title}", 'red'))
-        is_task_valid = False
-
-    # 校验任务状态合法性
-    if task_status_name not in MISSION_TYPE:
-        print(
-            colored(f"任务状态异常 | 预期: {task_status_name} | 实际: {MISSION_TYPE}", 'red'))
-        is_task_valid = False
-
-    # 校验项目名称一致性
-    if actual_project_name != task_project_name:
-        print(
-            colored(f"项目名称不一致 | 预期: {task_project_name} | 实际: {actual_project_name}", 'red'))
-        is_task_valid = False
-
-    # 校验自评时长一致性
-    converted_self_estimated_hours = convert_iso8601_to_hours(
-        raw_self_estimated_hours)
-    if converted_self_estimated_hours != float(task_estimated_hours_str):
-        print(
-            colored(f"自评时长不一致 | 预期: {task_estimated_hours_str}h | 实际: {converted_self_estimated_hours}h", 'red'))
-        is_task_valid = False
-
-    # 校验处理人一致性
-    if actual_responsible_name != HANDLER_NAME:
-        print(
-            colored(f"处理人不一致 | 预期: {HANDLER_NAME} | 实际: {actual_responsible_name}", 'red'))
-        is_task_valid = False
-
-    # 校验任务起止日期是否在本周范围内
-    is_start_date_legal = date_in_week(
-        task_start_date, current_week_mon, current_week_sun)
-    is_due_date_legal = date_in_week(
-        task_due_date, current_week_mon, current_week_sun)
-    # 传入校验日期选项，默认校验
-    check_date = option.get('check_date', True)
-    if check_date and not (is_start_date_legal and is_due_date_legal):
-        print(
-            colored(f"超出本周范围 | 开始日期: {task_start_date} | 截止日期: {task_due_date}", 'red'))
-        is_task_valid = False
-
-    # 校验预估工时是否正常
-    task_estimated_work_hours = get_estimated_work_hours(task_detail)
-    if task_estimated_work_hours <= 0:
-        print(colored(f"预估工时异常 | 实际: {task_estimated_work_hours}h", 'red'))
-        is_task_valid = False
-
-    if is_task_valid:
-        print(colored("校验通过", 'green'))
-
-    print("=" * 80, "\n")
-
-    return is_task_valid
+    try:
+        mission_info = get_mission_info(task_id_from_link)
+    except Exception as e:
+        mission_info = None
+        print(f"获取任务详情失败 | 任务ID: {task_id_from_link} | {e}")
+    if not isinstance(mission_info, MissionInfo):
+        result.add_error(
+            'fetch', f"任务详情获取失败 | 行号: {line_number} | 链接提取ID: {task_id_from_link}")
+        return result, None
+
+    result.category = mission_info.category
+    result.status = mission_info.status
+    result.responsible = mission_info.responsible
+    result.start_date = mission_info.start_date
+    result.due_date = mission_info.due_date
+    result.estimated_work_hours = mission_info.estimated_work_hours
+    return result, mission_info
+
+
+def _evaluate_with_rules(task_record, rule_set):
+    result, mission_info = _prepare_mission(task_record)
+    if mission_info is not None:
+        result.errors.extend(rule_set.evaluate(task_record, mission_info))
+    return result
+
+
+@timed_stage('evaluate_mission')
+def evaluate_mission(task_record, option):
+    """
+    获取任务详情并执行所有校验规则，不输出任何内容
+    :param task_record: TaskRecord 任务记录
+    :param option: 校验选项，check_date 为 False 时不校验起止日期，handler_name 指定预期处理人（默认 HANDLER_NAME）
+    :return: MissionCheckResult 对象
+    """
+    return _evaluate_with_rules(task_record, compile_rules(option))
+
+
+@timed_stage('check_mission')
+def check_mission(task_record, option):
+    """
+    校验单个任务并在控制台输出结果
+    :return: 是否校验通过
+    """
+    result = evaluate_mission(task_record, option)
+    render_console(result)
+    return result.passed
+
+
+def evaluate_missions(task_records, option, max_workers=FETCH_MAX_WORKERS):
+    """
+    批量预取任务详情后，使用同一个编译好的规则集并发校验
+    :param task_records: TaskRecord 列表
+    :param option: 校验选项，同 evaluate_mission
+    :param max_workers: 并发线程数
+    :return: 与 task_records 顺序一致的 MissionCheckResult 列表
+    """
+    prefetch_missions(task_records, max_workers)
+    rule_set = compile_rules(option)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return list(executor.map(
+            lambda task_record: _evaluate_with_rules(task_record, rule_set), task_records))
+
+
+@timed_stage('check_missions')
+def check_missions(task_records, option, max_workers=FETCH_MAX_WORKERS,
+                   output_format=CHECK_OUTPUT_FORMAT, output_path=CHECK_OUTPUT_PATH):
+    """
+    并发校验所有任务后，按原始行顺序输出结果
+    :param task_records: TaskRecord 列表
+    :param option: 校验选项，同 evaluate_mission
+    :param max_workers: 并发线程数
+    :param output_format: 输出格式，见 render_results
+    :param output_path: jsonl 格式的输出文件路径
+    :return: 与 task_records 顺序一致的 MissionCheckResult 列表
+    """
+    results = evaluate_missions(task_records, option, max_workers)
+    render_results(results, output_format, output_path)
+    return results
+
+
+def _is_result_reusable(result):
+    # 链接或任务详情获取失败的结果不保存，下次运行时重新检查
+    return not any(rule in ('link_id', 'fetch') for rule, _ in result.errors)
+
+
+@timed_stage('check_missions_incremental')
+def check_missions_incremental(task_records, option, state_path, max_workers=FETCH_MAX_WORKERS,
+                               output_format=CHECK_OUTPUT_FORMAT, output_path=CHECK_OUTPUT_PATH):
+    """
+    增量校验：只重新校验新增或修改过的行，以及任务详情有变化（lockVersion/updatedAt）的行，
+    其余行直接使用状态文件中上次的结果，最后按原始行顺序输出
+    :param task_records: TaskRecord 列表
+    :param option: 校验选项，同 evaluate_mission
+    :param state_path: 状态文件路径
+    :param max_workers: 并发线程数
+    :param output_format: 输出格式，见 render_results
+    :param output_path: jsonl 格式的输出文件路径
+    :return: 与 task_records 顺序一致的 MissionCheckResult 列表
+    """
+    state = load_state(state_path)
+    rule_fingerprint = compile_rules(option).fingerprint
+    line_keys = [get_line_key(task_record, rule_fingerprint) for task_record in task_records]
+
+    # 只为已有结果的行批量获取版本信息，判断任务详情是否有变化
+    mission_versions = get_mission_versions(
+        [task_record.wp_id for task_record, line_key in zip(task_records, line_keys) if line_key in state],
+        max_workers=max_workers
+    )
+
+    results = [None] * len(task_records)
+    recheck_indexes = []
+    changed_ids = []
+    for index, (task_record, line_key) in enumerate(zip(task_records, line_keys)):
+        line_state = state.get(line_key)
+        current_version = mission_versions.get(task_record.wp_id)
+        if line_state is not None and current_version is not None \
+                and list(current_version) == line_state['version']:
+            results[index] = MissionCheckResult.from_dict(line_state['result'])
+        else:
+            recheck_indexes.append(index)
+            if line_state is not None and current_version is not None:
+                changed_ids.append(task_record.wp_id)
+
+    print(f"增量检查 | 复用上次结果: {len(task_records) - len(recheck_indexes)} 条 | "
+          f"重新检查: {len(recheck_indexes)} 条")
+
+    # 任务详情已有变化，缓存中的旧内容不能再用于重新检查
+    invalidate_missions(changed_ids)
+
+    rechecked_results = evaluate_missions(
+        [task_records[index] for index in recheck_indexes], option, max_workers)
+    for index, result in zip(recheck_indexes, rechecked_results):
+        results[index] = result
+
+    # 只保留本次报告中的行，已删除的行随之清理
+    rechecked_indexes = set(recheck_indexes)
+    new_state = {}
+    for index, (task_record, line_key, result) in enumerate(zip(task_records, line_keys, results)):
+        if index not in rechecked_indexes:
+            new_state[line_key] = state[line_key]
+        elif _is_result_reusable(result):
+            # 优先保存本次探测到的版本信息，未探测（新增的行）时取任务详情中的版本
+            current_version = mission_versions.get(task_record.wp_id)
+            if current_version is None:
+                mission_info = get_mission_info(task_record.wp_id)
+                current_version = (mission_info.lock_version, mission_info.updated_at)
+            new_state[line_key] = {
+                'result': result.to_dict(),
+                'version': list(current_version)
+            }
+    save_state(state_path, new_state)
+
+    render_results(results, output_format, output_path)
+    return results
@@ -0,0 +1,118 @@
+import os
+import glob
+from common.parse_util import parse_task_line
+
+
+class TailedFile:
+    """
+    单个被监听文件的读取进度
+    """
+    __slots__ = ('offset', 'remainder', 'remainder_checked', 'hours', 'partial_record')
+
+    def __init__(self):
+        self.offset = 0  # 已读取的字节数
+        self.remainder = b''  # 末尾尚未以换行结束的内容
+        self.remainder_checked = False  # 末尾内容是否已按完整行解析过
+        self.hours = 0.0  # 该文件已识别任务的累计时长
+        self.partial_record = None  # 末行未换行但已识别的任务，后续追加时需要重新判断
+
+
+class ReportTailer:
+    """
+    按字节偏移量跟踪日报文本文件（或目录下的所有日报文件），每次只读取、解析新追加的行，
+    并维护累计时长
+    """
+
+    def __init__(self, watch_path, file_pattern='*.txt'):
+        """
+        :param watch_path: 日报文本文件或目录
+        :param file_pattern: 监听目录时匹配的文件名
+        """
+        self.watch_path = watch_path
+        self.file_pattern = file_pattern
+        self.total_hours = 0.0
+        self._files = {}
+
+    def _list_files(self):
+        if os.path.isdir(self.watch_path):
+            return sorted(glob.glob(os.path.join(self.watch_path, self.file_pattern)))
+        return [self.watch_path]
+
+    def _forget(self, file_path):
+        tailed_file = self._files.pop(file_path, None)
+        if tailed_file is not None:
+            self.total_hours -= tailed_file.hours
+
+    def _parse_line(self, tailed_file, raw_line, new_records, unrecognized_lines):
+        line = raw_line.decode('utf-8', errors='replace').lstrip('\ufeff').strip()
+        if not line:
+            return None
+
+        task_record = parse_task_line(line)
+        if task_record is None:
+            unrecognized_lines.append(line)
+            return None
+
+        tailed_file.hours += task_record.self_hours
+        self.total_hours += task_record.self_hours
+        new_records.append(task_record)
+        return task_record
+
+    def _read_appended(self, file_path, tailed_file, file_size, new_records, unrecognized_lines):
+        with open(file_path, 'rb') as tailed_fp:
+            tailed_fp.seek(tailed_file.offset)
+            appended_bytes = tailed_fp.read(file_size - tailed_file.offset)
+        tailed_file.offset += len(appended_bytes)
+
+        raw_lines = (tailed_file.remainder + appended_bytes).split(b'\n')
+        tailed_file.remainder = raw_lines.pop()
+        tailed_file.remainder_checked = False
+
+        partial_record = tailed_file.partial_record
+        tailed_file.partial_record = None
+        if partial_record is not None:
+            # 上次按末行识别的任务：内容未变则只是补上了换行，已变化则撤销后重新解析
+            if raw_lines and raw_lines[0].decode('utf-8', errors='replace').strip() == partial_record.line:
+                raw_lines.pop(0)
+            else:
+                tailed_file.hours -= partial_record.self_hours
+                self.total_hours -= partial_record.self_hours
+
+        for raw_line in raw_lines:
+            self._parse_line(tailed_file, raw_line, new_records, unrecognized_lines)
+
+    def poll(self):
+        """
+        检查所有文件的变化，读取新追加的内容
+        - 文件变小（被截断或重写）时从头重新读取
+        - 末行没有换行时，在文件一次轮询内未再变化才按完整行解析
+        :return: (新增的 TaskRecord 列表, 新增的无法识别的行列表)
+        """
+        new_records = []
+        unrecognized_lines = []
+        current_paths = self._list_files()
+
+        for file_path in set(self._files) - set(current_paths):
+            self._forget(file_path)
+
+        for file_path in current_paths:
+            try:
+                file_size = os.stat(file_path).st_size
+            except FileNotFoundError:
+                self._forget(file_path)
+                continue
+
+            tailed_file = self._files.get(file_path)
+            if tailed_file is None or file_size < tailed_file.offset:
+                self._forget(file_path)
+                tailed_file = self._files[file_path] = TailedFile()
+
+            if file_size > tailed_file.offset:
+                self._read_appended(file_path, tailed_file, file_size, new_records, unrecognized_lines)
+            elif tailed_file.remainder and not tailed_file.remainder_checked:
+                # 文件已不再变化，末行虽然没有换行也视为完整的一行
+                tailed_file.remainder_checked = True
+                tailed_file.partial_record = self._parse_line(
+                    tailed_file, tailed_file.remainder, new_records, unrecognized_lines)
+
+        return new_records, unrecognized_lines
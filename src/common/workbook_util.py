@@ -0,0 +1,116 @@
+from common.metrics_util import timed_stage
+from config.common import WORKBOOK_BACKEND
+
+
+class OpenpyxlWorkbook:
+    """
+    基于 openpyxl 的工作簿，纯 Python 实现，无需启动 Excel 进程，可在 Linux 上运行
+    """
+
+    def __init__(self, file_path):
+        import openpyxl
+
+        self.file_path = file_path
+        self.workbook = openpyxl.load_workbook(file_path)
+        self.worksheet = self.workbook.worksheets[0]
+
+    @timed_stage('workbook.write_rows')
+    def write_rows(self, start_row, rows, start_column=2):
+        """
+        从指定单元格开始写入二维数组
+        :param start_row: 起始行号（从1开始）
+        :param rows: 行数据列表
+        :param start_column: 起始列号，默认 2 即 B 列
+        """
+        for row_offset, row_values in enumerate(rows):
+            for column_offset, cell_value in enumerate(row_values):
+                self.worksheet.cell(
+                    row=start_row + row_offset,
+                    column=start_column + column_offset,
+                    value=cell_value
+                )
+
+    @timed_stage('workbook.save')
+    def save(self, file_path=None):
+        self.workbook.save(file_path or self.file_path)
+
+    def close(self):
+        self.workbook.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class XlwingsWorkbook:
+    """
+    基于 xlwings 的工作簿，需要本机安装 Excel
+    """
+
+    def __init__(self, file_path):
+        import xlwings as xw
+
+        self.file_path = file_path
+        self.excel_app = xw.App(visible=False, add_book=False)
+        try:
+            self.workbook = self.excel_app.books.open(file_path, read_only=False)
+        except Exception:
+            self.excel_app.quit()
+            raise
+        self.worksheet = self.workbook.sheets[0]
+
+    @timed_stage('workbook.write_rows')
+    def write_rows(self, start_row, rows, start_column=2):
+        """
+        通过一次区域赋值写入二维数组，写入期间关闭屏幕刷新和自动计算
+        :param start_row: 起始行号（从1开始）
+        :param rows: 行数据列表
+        :param start_column: 起始列号，默认 2 即 B 列
+        """
+        if not rows:
+            return
+
+        self.excel_app.screen_updating = False
+        self.excel_app.calculation = 'manual'
+        try:
+            self.worksheet.range((start_row, start_column)).value = rows
+        finally:
+            self.excel_app.calculation = 'automatic'
+            self.excel_app.screen_updating = True
+
+    @timed_stage('workbook.save')
+    def save(self, file_path=None):
+        self.workbook.save(file_path)
+
+    def close(self):
+        try:
+            self.workbook.close()
+        finally:
+            self.excel_app.quit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+WORKBOOK_BACKENDS = {
+    'openpyxl': OpenpyxlWorkbook,
+    'xlwings': XlwingsWorkbook
+}
+
+
+@timed_stage('workbook.open')
+def open_workbook(file_path, backend=WORKBOOK_BACKEND):
+    """
+    使用指定的后端打开工作簿
+    :param file_path: Excel文件的完整路径
+    :param backend: 后端名称，openpyxl 或 xlwings
+    :return: 工作簿对象，支持 with 语句
+    """
+    if backend not in WORKBOOK_BACKENDS:
+        raise ValueError(f"不支持的工作簿后端：{backend}，可选：{', '.join(WORKBOOK_BACKENDS)}")
+    return WORKBOOK_BACKENDS[backend](file_path)
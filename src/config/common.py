@@ -2,13 +2,88 @@
 COOKIE = ''
 API_BASE_URL = ''
 
+# 网络配置
+HTTP_CONNECT_TIMEOUT = 5  # 建立连接超时（秒）
+HTTP_READ_TIMEOUT = 15  # 读取响应超时（秒）
+HTTP_MAX_RETRIES = 3  # 5xx/连接重置时的最大重试次数
+HTTP_BACKOFF_FACTOR = 0.5  # 重试退避系数，等待时间为 factor * 2^(n-1) 秒
+HTTP_POOL_SIZE = 16  # 连接池大小
+BATCH_FETCH_ENABLED = True  # 是否通过集合接口批量获取任务详情
+BATCH_PAGE_SIZE = 50  # 每次批量请求的任务ID数量
+API_SELECT_FIELDS_ENABLED = False  # 批量接口只请求用到的字段（需接口支持 select 参数）
+FETCH_MAX_WORKERS = 8  # 并发获取任务详情的线程数，为1时串行执行
+
+# 接口限流
+API_RATE_LIMIT = 20  # 每秒最多请求数，为0时不限流
+API_RATE_BURST = 10  # 允许的突发请求数
+API_MIN_CONCURRENCY = 1  # 自适应并发上限的下限
+API_MAX_CONCURRENCY = 8  # 自适应并发上限的上限
+API_LATENCY_TARGET = 3.0  # 请求耗时超过该值（秒）时视为服务端压力过大，降低并发
+API_MAX_RETRY_AFTER = 30  # Retry-After 最长等待秒数
+
+# 任务详情持久化缓存
+CACHE_ENABLED = True
+CACHE_DB_PATH = ''  # 为空时使用 ~/.niuma_helper/mission_cache.db
+CACHE_TTL_SECONDS = 3600  # 有效期内直接使用缓存，超过后需重新验证
+CACHE_MAX_ENTRIES = 5000  # 缓存条目上限，超出时淘汰最久未访问的条目
+
+# 接口快照：record 录制接口返回的任务详情，replay 从快照回放而不请求接口，为空时关闭
+# 录制和回放时不使用持久化缓存
+SNAPSHOT_MODE = ''
+SNAPSHOT_PATH = 'snapshots/missions.jsonl.gz'
+
 # 状态配置
 MISSION_TYPE = ['待检查', '已实现']
 HANDLER_NAME = ''
 
+# 校验规则：按顺序执行的内置规则名，为空时执行全部内置规则
+# task_id、title、status、project、self_hours、handler、week_range、estimated_hours
+CHECK_RULES = []
+# 自定义校验规则：'模块路径:函数名'，函数签名为 (task_record, mission_info, context)，
+# 未通过时返回错误说明，通过时返回 None，规则名为函数名
+CUSTOM_CHECK_RULES = []
+
+# 工作簿后端：openpyxl（无需Excel，可在Linux运行）或 xlwings（需要本机安装Excel）
+WORKBOOK_BACKEND = 'openpyxl'
+FILL_QUEUE_SIZE = 64  # 填充流水线中待写入行的队列上限
+
 # 模板路径
 TEMPLATE_PATH = rf''
 TARGET_TEMPLATE_DIR_PATH = ''
 
-# 检查路径
+# 历史周报索引：生成周报时提示已在往期周报中填报过的任务
+HISTORY_INDEX_ENABLED = True
+HISTORY_DB_PATH = ''  # 为空时使用 ~/.niuma_helper/report_history.db
+
+# 检查路径：单个文件、通配符（如 D:/周报/*.xlsx）或路径列表
 CHECK_REPORTS_PATH = rf''
+CHECK_PARSE_WORKERS = 4  # 多个表格时解析表格的进程数
+EXCEL_READ_ENGINE = ''  # 为空时自动选择：已安装 python-calamine 时使用 calamine，否则使用 openpyxl
+
+# 团队检查：花名册为每行一个姓名的文本文件，为空时按报告文件名（“姓名-xxx”）识别处理人
+TEAM_ROSTER_PATH = rf''
+TEAM_REPORTS_DIR_PATH = rf''  # 每人一个日报文本（.txt）或周报表格（.xlsx）
+TEAM_OUTPUT_DIR_PATH = rf''  # 每人的校验结果和汇总输出目录
+
+# 运行统计：开启后在运行结束时输出各阶段耗时、HTTP耗时分布和缓存命中率
+METRICS_ENABLED = False
+METRICS_OUTPUT_PATH = ''  # 统计结果JSON文件路径，为空时不输出
+METRICS_TRACE_PATH = ''  # Chrome Trace 文件路径，为空时不输出
+
+# 增量检查：只重新校验新增/修改的行和任务详情有变化的行
+INCREMENTAL_CHECK_ENABLED = True
+CHECK_STATE_DIR_PATH = ''  # 状态文件目录，为空时使用 ~/.niuma_helper
+
+# 监听模式：轮询日报文本文件（或目录），只校验新追加的行
+WATCH_POLL_INTERVAL = 0.5  # 轮询间隔（秒），只检查文件大小，无变化时几乎不占用CPU
+WATCH_FILE_PATTERN = '*.txt'  # 监听目录时匹配的文件名
+
+# 校验结果输出
+CHECK_OUTPUT_FORMAT = 'console'  # console（逐条彩色输出）、jsonl、summary（汇总表）
+CHECK_OUTPUT_PATH = ''  # jsonl 格式的输出文件路径，为空时输出到控制台
+
+# 自动关闭微信：到达每个计划的时间后终止对应的进程（进程名精确匹配，不区分大小写）
+CLOSE_WECHAT_SCHEDULES = [
+    {'time': '17:30', 'process_names': ['WeChatAppEx.exe', 'Weixin.exe']},
+]
+CLOSE_WECHAT_LOG_DIR_PATH = ''  # 日志根目录，按日期分子目录，为空时使用 ~/.niuma_helper/logs
@@ -0,0 +1,239 @@
+import json
+import time
+import random
+import argparse
+import datetime
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from common.snapshot_util import load_snapshot
+from config.common import HANDLER_NAME, MISSION_TYPE
+
+MOCK_HOST = '127.0.0.1'
+MOCK_PORT = 8765
+MOCK_BASE_PATH = '/api/v3/work_packages'
+
+
+def build_work_package(mission_id, handler_name=HANDLER_NAME):
+    """
+    生成一个字段完整、能通过校验的模拟任务详情
+    :param mission_id: 任务ID
+    :param handler_name: 处理人
+    :return: 与接口结构一致的任务详情字典
+    """
+    mission_id = int(mission_id)
+    today = datetime.date.today()
+    monday = today - datetime.timedelta(days=today.weekday())
+    hours = mission_id % 8 + 1
+
+    return {
+        '_type': 'WorkPackage',
+        'id': mission_id,
+        'lockVersion': 1,
+        'subject': f'模拟任务{mission_id}',
+        'description': {
+            'format': 'markdown',
+            'raw': f'预估工时/时长：{hours}',
+            'html': f'<p class="op-uc-p">预估工时/时长：{hours}h</p>'
+        },
+        'startDate': monday.isoformat(),
+        'dueDate': (monday + datetime.timedelta(days=4)).isoformat(),
+        'estimatedTime': f'PT{hours}H',
+        'customField1': str(hours),
+        'createdAt': f'{monday.isoformat()}T00:00:00Z',
+        'updatedAt': f'{monday.isoformat()}T00:00:00Z',
+        '_embedded': {
+            'type': {'_type': 'Type', 'id': 1, 'name': '任务'},
+            'status': {'_type': 'Status', 'id': 1, 'name': MISSION_TYPE[-1]},
+            'project': {'_type': 'Project', 'id': mission_id % 10, 'name': f'模拟项目{mission_id % 10}'},
+            'responsible': {'_type': 'User', 'id': 1, 'name': handler_name}
+        },
+        '_links': {
+            'self': {'href': f'{MOCK_BASE_PATH}/{mission_id}', 'title': f'模拟任务{mission_id}'}
+        }
+    }
+
+
+def _select_fields(element, select):
+    # 只支持 elements/<字段> 形式的字段选择，关联对象与接口一致，只在 _links 中返回 href 和 title
+    field_names = [item.split('/', 1)[1] for item in select.split(',') if item.startswith('elements/')]
+    selected = {field_name: element[field_name] for field_name in field_names if field_name in element}
+    embedded_data = element.get('_embedded', {})
+    linked_fields = {
+        field_name: {'href': f"/api/v3/{field_name}/{embedded_data[field_name].get('id')}",
+                     'title': embedded_data[field_name].get('name')}
+        for field_name in field_names if field_name in embedded_data
+    }
+    if linked_fields:
+        selected['_links'] = linked_fields
+    return selected
+
+
+class MockApiHandler(BaseHTTPRequestHandler):
+    """
+    模拟任务接口：
+    - GET {base}/<id>：单个任务详情，支持 If-None-Match
+    - GET {base}?filters=[{"id":{"operator":"=","values":[...]}}]：批量获取，支持 select
+    """
+
+    server_version = 'NiumaMockApi/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status_code, body, headers=None):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/hal+json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for header_name, header_value in (headers or {}).items():
+            self.send_header(header_name, header_value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, status_code, message, headers=None):
+        self._send_json(status_code, {'_type': 'Error', 'message': message}, headers)
+
+    def _get_mission(self, mission_id):
+        if self.server.missions is not None:
+            return self.server.missions.get(str(mission_id))
+        return build_work_package(mission_id)
+
+    def do_GET(self):
+        self.server.simulate_latency()
+        if self.server.should_fail():
+            self._send_error(503, '模拟服务不可用', {'Retry-After': '1'})
+            return
+
+        parsed_url = urlparse(self.path)
+        path = parsed_url.path.rstrip('/')
+        last_segment = path.rsplit('/', 1)[-1]
+
+        if last_segment.isdigit():
+            self._handle_single(last_segment)
+        else:
+            self._handle_collection(parse_qs(parsed_url.query))
+
+    def _handle_single(self, mission_id):
+        mission_info = self._get_mission(mission_id)
+        if mission_info is None:
+            self._send_error(404, f'任务 {mission_id} 不存在')
+            return
+
+        etag = f'W/"{mission_info["id"]}-{mission_info.get("lockVersion", 0)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self._send_json(200, mission_info, {'ETag': etag})
+
+    def _handle_collection(self, query):
+        try:
+            filters = json.loads(query.get('filters', ['[]'])[0])
+            mission_ids = next(
+                (item['id']['values'] for item in filters if 'id' in item), [])
+        except (ValueError, KeyError, TypeError):
+            self._send_error(400, '无效的 filters 参数')
+            return
+
+        elements = [mission_info for mission_info in map(self._get_mission, mission_ids)
+                    if mission_info is not None]
+        select = query.get('select', [''])[0]
+        if select:
+            elements = [_select_fields(element, select) for element in elements]
+
+        self._send_json(200, {
+            '_type': 'Collection',
+            'total': len(elements),
+            'count': len(elements),
+            'pageSize': len(elements),
+            'offset': 1,
+            '_embedded': {'elements': elements}
+        })
+
+
+class MockApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, jitter=0.0, error_rate=0.0, missions=None, verbose=False):
+        """
+        :param address: (host, port)
+        :param latency: 每次请求的固定延迟（秒）
+        :param jitter: 在固定延迟上叠加的随机延迟上限（秒）
+        :param error_rate: 返回 503 的概率（0~1）
+        :param missions: {任务ID: 任务详情}，为 None 时按ID生成模拟数据
+        :param verbose: 是否输出访问日志
+        """
+        super().__init__(address, MockApiHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.missions = missions
+        self.verbose = verbose
+        self._random = random.Random()
+        self._random_lock = threading.Lock()
+
+    def simulate_latency(self):
+        with self._random_lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def should_fail(self):
+        with self._random_lock:
+            return self._random.random() < self.error_rate
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}{MOCK_BASE_PATH}'
+
+
+def start_mock_server(host=MOCK_HOST, port=0, **server_options):
+    """
+    在后台线程中启动模拟接口，供基准测试和离线调试使用
+    :param host: 监听地址
+    :param port: 监听端口，0 表示随机端口
+    :param server_options: 传递给 MockApiServer 的其他参数
+    :return: MockApiServer 对象，通过 base_url 获取接口地址，用完调用 shutdown()
+    """
+    server = MockApiServer((host, port), **server_options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟任务接口')
+    parser.add_argument('--host', default=MOCK_HOST)
+    parser.add_argument('--port', type=int, default=MOCK_PORT)
+    parser.add_argument('--latency', type=float, default=0.0, help='每次请求的固定延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='随机延迟上限（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回 503 的概率（0~1）')
+    parser.add_argument('--snapshot', default='', help='从快照文件提供数据，为空时按ID生成模拟数据')
+    parser.add_argument('--verbose', action='store_true', help='输出访问日志')
+    args = parser.parse_args()
+
+    missions = load_snapshot(args.snapshot) if args.snapshot else None
+    server = MockApiServer(
+        (args.host, args.port),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        missions=missions,
+        verbose=args.verbose
+    )
+    print(f"模拟接口已启动：{server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import sys
+import argparse
+
+# 各子命令在执行时才导入对应模块：pandas、requests 等导入较慢，只校验几行文本时不需要等待
+
+
+def run_check_text(args):
+    from auto_check_online_mission import check_online_text
+    from common.parse_util import iter_source_lines
+    return 0 if check_online_text(iter_source_lines(args.source)) else 1
+
+
+def run_watch(args):
+    from auto_check_online_mission import watch_online_text
+    watch_online_text(args.path)
+    return 0
+
+
+def run_check_sheet(args):
+    from auto_check_reports import check_report_files
+    from config.common import CHECK_REPORTS_PATH
+    check_report_files(args.paths or CHECK_REPORTS_PATH)
+    return 0
+
+
+def run_fill(args):
+    from auto_fill_reports import fill_report
+    from common.parse_util import iter_source_lines
+    fill_report(iter_source_lines(args.source))
+    return 0
+
+
+def run_close_wechat(args):
+    from auto_close_wechat import close_wechat
+    close_wechat(args.daemon)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='niuma', description='日报周报自动化工具')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    check_text_parser = subparsers.add_parser('check-text', help='校验日报文本中的任务')
+    check_text_parser.add_argument('source', nargs='?', default='-', help="日报文本文件，'-' 或不填时读取标准输入")
+    check_text_parser.set_defaults(handler=run_check_text)
+
+    watch_parser = subparsers.add_parser('watch', help='监听日报文本文件或目录，只校验新追加的行')
+    watch_parser.add_argument('path', help='日报文本文件或目录')
+    watch_parser.set_defaults(handler=run_watch)
+
+    check_sheet_parser = subparsers.add_parser('check-sheet', help='检查周报表格')
+    check_sheet_parser.add_argument('paths', nargs='*', help='表格路径或通配符，不填时使用 CHECK_REPORTS_PATH')
+    check_sheet_parser.set_defaults(handler=run_check_sheet)
+
+    fill_parser = subparsers.add_parser('fill', help='根据日报文本生成并填充本周周报')
+    fill_parser.add_argument('source', nargs='?', default='-', help="日报文本文件，'-' 或不填时读取标准输入")
+    fill_parser.set_defaults(handler=run_fill)
+
+    close_wechat_parser = subparsers.add_parser('close-wechat', help='到达计划时间后关闭微信等进程')
+    close_wechat_parser.add_argument('--daemon', action='store_true', help='常驻运行，按计划时间依次执行')
+    close_wechat_parser.set_defaults(handler=run_close_wechat)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import argparse
+import datetime
+from common.history_util import ReportHistoryIndex
+from config.common import TARGET_TEMPLATE_DIR_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description='历史周报索引：查询重复填报、汇总工作时长')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('update', help='扫描周报目录并增量更新索引')
+
+    find_parser = subparsers.add_parser('find', help='查询任务在哪些周报中填报过')
+    find_parser.add_argument('wp_ids', nargs='+', help='任务ID')
+
+    rollup_parser = subparsers.add_parser('rollup', help='按项目或任务汇总工作时长')
+    rollup_parser.add_argument('--start', required=True, help='开始日期 YYYY-MM-DD')
+    rollup_parser.add_argument('--end', default=datetime.date.today().isoformat(), help='结束日期 YYYY-MM-DD')
+    rollup_parser.add_argument('--by', choices=['project', 'wp_id'], default='project', help='汇总维度')
+
+    args = parser.parse_args()
+
+    history_index = ReportHistoryIndex()
+    try:
+        # 查询前都先增量更新，未变化的文件不会重新读取
+        updated_count, removed_count = history_index.update(TARGET_TEMPLATE_DIR_PATH)
+        print(f"索引已更新 | 重新读取: {updated_count} 个文件 | 移除: {removed_count} 个文件")
+
+        if args.command == 'find':
+            reported_tasks = history_index.find_reported(args.wp_ids)
+            for wp_id in args.wp_ids:
+                report_list = reported_tasks.get(str(wp_id), [])
+                if not report_list:
+                    print(f"{wp_id}：未填报")
+                for report_path, row_number, task_title, hours in report_list:
+                    print(f"{wp_id}：{report_path} 第 {row_number} 行 | {task_title} | {hours}小时")
+        elif args.command == 'rollup':
+            for group_name, total_hours, row_count in history_index.rollup_hours(args.start, args.end, args.by):
+                print(f"{group_name} | {total_hours}小时 | {row_count} 条")
+    finally:
+        history_index.close()
+
+
+if __name__ == "__main__":
+    main()